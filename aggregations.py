@@ -0,0 +1,130 @@
+from gpa_calculator import GpaAccumulator
+from grade_manager import NAME, SCORE, _row_units
+
+# One-pass aggregations over record tuples (see grade_manager.iter_records).
+# Each keeps only its running result, so a report over a file of any size
+# runs in constant memory (GroupBy: one aggregation per group). They are
+# fed with add(record) and read with result(), and compose: Combined runs
+# several side by side and GroupBy runs one per key.
+
+
+def student_key(record):
+    """Group records by student like the all-GPAs view does (records with a
+    blank name are left out)"""
+    return record[NAME].strip() or None
+
+
+def _score(record):
+    return int(record[SCORE])
+
+
+class Count:
+    def __init__(self):
+        self.count = 0
+
+    def add(self, record):
+        self.count += 1
+
+    def result(self):
+        return self.count
+
+
+class Gpa:
+    """GPA of every record added, on the given grading scale"""
+
+    def __init__(self, scale=None):
+        self.scale = scale
+        self.totals = GpaAccumulator()
+
+    def add(self, record):
+        self.totals.add(_score(record), _row_units(record), self.scale)
+
+    def result(self):
+        return self.totals.gpa
+
+
+class ScoreRange:
+    """(lowest, highest) score, or None before any record"""
+
+    def __init__(self):
+        self.low = None
+        self.high = None
+
+    def add(self, record):
+        score = _score(record)
+        if self.low is None:
+            self.low = self.high = score
+        elif score < self.low:
+            self.low = score
+        elif score > self.high:
+            self.high = score
+
+    def result(self):
+        return None if self.low is None else (self.low, self.high)
+
+
+class Histogram:
+    """Scores counted in bins of bin_width: {bin start: count} for every bin
+    from 0 to 100. A score of 100 goes in the top bin"""
+
+    def __init__(self, bin_width=10):
+        self.bin_width = bin_width
+        self.counts = [0] * -(-100 // bin_width)
+
+    def add(self, record):
+        score = min(max(_score(record), 0), 100)
+        self.counts[min(score // self.bin_width, len(self.counts) - 1)] += 1
+
+    def result(self):
+        return {index * self.bin_width: count
+                for index, count in enumerate(self.counts)}
+
+
+class Combined:
+    """Several aggregations over the same records: {name: result}"""
+
+    def __init__(self, **aggregations):
+        self.aggregations = aggregations
+
+    def add(self, record):
+        for aggregation in self.aggregations.values():
+            aggregation.add(record)
+
+    def result(self):
+        return {name: aggregation.result()
+                for name, aggregation in self.aggregations.items()}
+
+
+class GroupBy:
+    """One aggregation per key(record), made by calling make(), e.g.
+    GroupBy(student_key, Gpa) for every student's GPA. Records whose key is
+    None are skipped"""
+
+    def __init__(self, key, make):
+        self.key = key
+        self.make = make
+        self.groups = {}
+
+    def add(self, record):
+        key = self.key(record)
+        if key is None:
+            return
+        aggregation = self.groups.get(key)
+        if aggregation is None:
+            aggregation = self.groups[key] = self.make()
+        aggregation.add(record)
+
+    def result(self):
+        return {key: aggregation.result()
+                for key, aggregation in self.groups.items()}
+
+
+def aggregate(records, **aggregations):
+    """Feed records through the aggregations in a single pass and return
+    {name: result}, e.g.
+        aggregate(iter_records(level="100"), count=Count(), gpa=Gpa(),
+                  histogram=Histogram())"""
+    combined = Combined(**aggregations)
+    for record in records:
+        combined.add(record)
+    return combined.result()
@@ -0,0 +1,100 @@
+import tkinter as tk
+
+# Keys that move through or close the list rather than change the text
+NAVIGATION_KEYS = {"Up", "Down", "Return", "KP_Enter", "Escape", "Tab",
+                   "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L",
+                   "Alt_R", "Left", "Right", "Home", "End"}
+
+
+class Autocomplete:
+    """Drop-down list of completions under an Entry, refreshed as the user
+    types. complete(text) returns the completions; Up/Down move through
+    them, Return or a click picks one and Escape closes the list"""
+
+    def __init__(self, entry, complete, rows=6, font=None, fg="#0a0f1f",
+                 bg="#f0f4f9", select_bg="#667eea", select_fg="#ffffff"):
+        self.entry = entry
+        self.complete = complete
+        self.rows = rows
+
+        self.popup = tk.Toplevel(entry)
+        self.popup.withdraw()
+        self.popup.overrideredirect(True)
+        self.listbox = tk.Listbox(
+            self.popup, height=rows, font=font, fg=fg, bg=bg,
+            selectbackground=select_bg, selectforeground=select_fg,
+            relief=tk.FLAT, bd=1, highlightthickness=0, activestyle="none",
+            exportselection=False)
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind("<ButtonRelease-1>", self._on_click)
+        self.shown = False
+
+        # add="+" keeps the entry's own focus bindings
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+        entry.bind("<Down>", lambda event: self._move(1), add="+")
+        entry.bind("<Up>", lambda event: self._move(-1), add="+")
+        entry.bind("<Return>", self._on_return, add="+")
+        entry.bind("<Escape>", lambda event: self.hide(), add="+")
+        # Let a click on the list land before it is hidden
+        entry.bind("<FocusOut>", lambda event: entry.after(150, self.hide),
+                   add="+")
+
+    def _on_key(self, event):
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        text = self.entry.get()
+        matches = self.complete(text) if text.strip() else []
+        if not matches or matches == [text]:
+            self.hide()
+            return
+
+        self.listbox.delete(0, tk.END)
+        for match in matches:
+            self.listbox.insert(tk.END, match)
+        self.listbox.config(height=min(len(matches), self.rows))
+        self.show()
+
+    def show(self):
+        entry = self.entry
+        self.popup.geometry(f"{entry.winfo_width()}x"
+                            f"{self.listbox.winfo_reqheight()}+"
+                            f"{entry.winfo_rootx()}+"
+                            f"{entry.winfo_rooty() + entry.winfo_height()}")
+        self.popup.deiconify()
+        self.popup.lift()
+        self.shown = True
+
+    def hide(self):
+        if self.shown:
+            self.popup.withdraw()
+            self.shown = False
+
+    def _move(self, step):
+        if not self.shown:
+            return None
+        selection = self.listbox.curselection()
+        index = selection[0] + step if selection else (0 if step > 0 else -1)
+        index %= self.listbox.size()
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return "break"
+
+    def _on_return(self, event):
+        selection = self.listbox.curselection()
+        if not self.shown or not selection:
+            return None
+        self.pick(self.listbox.get(selection[0]))
+        return "break"
+
+    def _on_click(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.pick(self.listbox.get(selection[0]))
+
+    def pick(self, value):
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, value)
+        self.entry.icursor(tk.END)
+        self.hide()
+        self.entry.focus_set()
@@ -0,0 +1,318 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import grade_manager
+from aggregations import Count, Gpa, Histogram, aggregate
+from gpa_calculator import calculate_gpa
+from snapshot import save_snapshot
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_OUTPUT = "benchmark_results.json"
+# A benchmark counts as a regression when it is this much slower
+DEFAULT_THRESHOLD = 0.25
+
+DEPARTMENTS = ("CSC", "ICT", "MTH", "PHY", "STA", "GST")
+LEVELS = ("100", "200", "300", "400")
+FIRST_NAMES = ("Ada", "Chinedu", "Ngozi", "Emeka", "Fatima", "Tunde", "Amaka",
+               "Ibrahim", "Zainab", "Segun", "Kemi", "Obinna", "Halima",
+               "Femi", "Aisha", "Uche", "Bola", "Musa", "Ifeoma", "Yusuf")
+SURNAMES = ("Okafor", "Adeyemi", "Bello", "Eze", "Okonkwo", "Abubakar",
+            "Ogunleye", "Nwosu", "Lawal", "Ibe", "Afolabi", "Danjuma",
+            "Olawale", "Chukwu", "Garba", "Onyekachi", "Balogun", "Yakubu")
+COURSES_PER_SEMESTER = 8
+
+
+def generate_records(rows, seed=0):
+    """Yield `rows` synthetic records shaped like a real department: each
+    student takes about eight courses a semester, level by level, one
+    session a year, with scores around a per-student ability"""
+    rng = random.Random(seed)
+    courses = {(level, semester): [
+        f"{department}{level[0]}{semester}{number}"
+        for department in DEPARTMENTS for number in range(1, 4)]
+        for level in LEVELS for semester in ("1", "2")}
+
+    produced = 0
+    student = 0
+    while produced < rows:
+        student += 1
+        name = (f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)} "
+                f"{student:06d}")
+        ability = rng.gauss(58, 10)
+        first_year = rng.randint(2016, 2024)
+        # Most students are part-way through; a few have finished
+        years = rng.choices((1, 2, 3, 4), weights=(35, 30, 20, 15))[0]
+
+        for year in range(years):
+            level = LEVELS[year]
+            session = f"{first_year + year}/{first_year + year + 1}"
+            for semester in ("1", "2"):
+                for course in rng.sample(courses[level, semester],
+                                         COURSES_PER_SEMESTER):
+                    if produced == rows:
+                        return
+                    score = min(max(int(rng.gauss(ability, 12)), 0), 100)
+                    units = rng.choices((1, 2, 3, 4),
+                                        weights=(10, 40, 40, 10))[0]
+                    yield (name, course, str(score), level, semester,
+                           session, str(units))
+                    produced += 1
+
+
+def write_dataset(path, rows, seed=0):
+    """Write a synthetic records CSV; returns the distinct student names"""
+    names = {}
+    with open(path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(grade_manager.FIELDNAMES)
+        for record in generate_records(rows, seed):
+            names[record[0]] = None
+            writer.writerow(record)
+    return list(names)
+
+
+def summarize(latencies, peak_bytes):
+    """ops/sec and latency percentiles (in milliseconds) for a list of
+    per-operation times in nanoseconds"""
+    times = np.array(latencies, dtype=np.float64) / 1e6
+    total = times.sum()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / (total / 1000), 2)
+        if total else None,
+        "mean_ms": round(float(times.mean()), 4),
+        "p50_ms": round(float(np.percentile(times, 50)), 4),
+        "p99_ms": round(float(np.percentile(times, 99)), 4),
+        "peak_kib": round(peak_bytes / 1024, 1)
+        if peak_bytes is not None else None,
+    }
+
+
+def measure(operation, repeat, setup=None, memory=True):
+    """Time `repeat` calls of operation() (setup() runs untimed before each
+    one), then run it once more under tracemalloc for its peak memory"""
+    latencies = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        operation()
+        latencies.append(time.perf_counter_ns() - start)
+
+    peak = None
+    if memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return summarize(latencies, peak)
+
+
+def run_size(rows, args):
+    """Run every benchmark against a fresh dataset of `rows` records"""
+    folder = tempfile.mkdtemp(prefix="grade-bench-")
+    grade_manager.DATA_FOLDER = folder
+    grade_manager.FILE_PATH = os.path.join(folder, "students.csv")
+    rng = random.Random(args.seed)
+    results = {}
+
+    def report(name, result):
+        results[name] = result
+        print(f"  {name:<34} {result['ops_per_sec'] or 0:>12,.1f} ops/s"
+              f"  p50 {result['p50_ms']:>9.3f} ms"
+              f"  p99 {result['p99_ms']:>9.3f} ms", flush=True)
+
+    try:
+        start = time.perf_counter()
+        names = write_dataset(grade_manager.FILE_PATH, rows, args.seed)
+        print(f"{rows:,} rows, {len(names):,} students "
+              f"(generated in {time.perf_counter() - start:.1f}s)",
+              flush=True)
+        memory = not args.no_memory
+        slow_repeat = max(3, args.repeat // 20)
+
+        def cold_start():
+            grade_manager.clear_cache()
+            snapshot = grade_manager.FILE_PATH + ".snapshot"
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+
+        report("load_records_csv", measure(
+            grade_manager.load_record_store, slow_repeat, cold_start, memory))
+        # Loading only writes a snapshot from SNAPSHOT_MIN_ROWS rows up, so
+        # write one here or small sizes would time the CSV parse again
+        store = grade_manager.load_record_store()
+        stat = os.stat(grade_manager.FILE_PATH)
+        save_snapshot(store, grade_manager.FILE_PATH + ".snapshot",
+                      grade_manager.FILE_PATH, stat.st_size, stat.st_mtime_ns)
+        report("load_records_snapshot", measure(
+            grade_manager.load_record_store, slow_repeat,
+            grade_manager.clear_cache, memory))
+
+        def pick():
+            return rng.choice(names)
+
+        for name, loader in (
+                ("load_student_scores", grade_manager.load_student_scores),
+                ("load_student_courses_and_scores",
+                 grade_manager.load_student_courses_and_scores),
+                ("query_student", grade_manager.query_student)):
+            report(name, measure(lambda: loader(pick()), args.repeat,
+                                 memory=memory))
+
+        # Per keystroke: a random prefix of a name, and a name with a typo
+        grade_manager.update_name_indexes()
+
+        def complete():
+            name = pick()
+            grade_manager.complete_names(name[:rng.randint(1, len(name))])
+
+        def suggest():
+            name = pick()
+            position = rng.randrange(len(name))
+            grade_manager.suggest_names(name[:position] + "x" +
+                                        name[position + 1:])
+
+        report("complete_names", measure(complete, args.repeat,
+                                         memory=memory))
+        report("suggest_names", measure(suggest, args.repeat, memory=memory))
+
+        def drop_totals():
+            grade_manager.clear_cache()
+            grade_manager.load_record_store()
+
+        report("all_student_gpas_cold", measure(
+            grade_manager.load_all_student_gpas, slow_repeat, drop_totals,
+            memory))
+        report("all_student_gpas_warm", measure(
+            grade_manager.load_all_student_gpas, slow_repeat, memory=memory))
+
+        # Serial against one worker per core, as gpa_report.py runs it
+        # (files below PARALLEL_SCAN_MIN_BYTES, or a process running other
+        # threads, are always scanned serially)
+        for name, workers in (("scan_gpa_totals_serial", 1),
+                              ("scan_gpa_totals_parallel", None)):
+            report(name, measure(
+                lambda: grade_manager.scan_term_totals(workers=workers),
+                slow_repeat, memory=memory))
+
+        def stream_report():
+            aggregate(grade_manager.iter_records(level="100"),
+                      count=Count(), gpa=Gpa(), histogram=Histogram())
+
+        report("stream_report", measure(stream_report, slow_repeat,
+                                        memory=memory))
+
+        scores = grade_manager.load_student_scores(names[0])
+        report("calculate_gpa", measure(lambda: calculate_gpa(scores),
+                                        args.repeat * 10, memory=memory))
+
+        def save():
+            grade_manager.save_student_record(
+                pick(), "BEN101", rng.randint(0, 100), "100", "1",
+                "2024/2025", 2)
+
+        report("save_student_record", measure(save, args.saves,
+                                              memory=memory))
+    finally:
+        grade_manager.clear_cache()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the p50 change for every benchmark in both runs; returns the
+    number of regressions beyond threshold"""
+    regressions = 0
+    print(f"\nCompared with baseline (regression: p50 > +{threshold:.0%})")
+    for size, benchmarks in results["results"].items():
+        for name, result in benchmarks.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before or not before.get("p50_ms"):
+                continue
+            change = result["p50_ms"] / before["p50_ms"] - 1
+            flag = ""
+            if change > threshold:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"  {size:>9} {name:<34} {before['p50_ms']:>9.3f} -> "
+                  f"{result['p50_ms']:>9.3f} ms ({change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the record store and GPA hot paths on "
+        "synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="dataset sizes in rows (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=200,
+                        help="calls per fast benchmark (default: "
+                        "%(default)s); loads run repeat/20 times")
+    parser.add_argument("--saves", type=int, default=50,
+                        help="save_student_record calls (default: "
+                        "%(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc pass")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="JSON results file (default: %(default)s)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="earlier results file; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed p50 slowdown for --compare "
+                        "(default: %(default)s)")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for rows in args.sizes:
+        results["results"][str(rows)] = run_size(rows, args)
+
+    if resource is not None:
+        # Kilobytes on Linux, bytes on macOS
+        results["meta"]["max_rss"] = resource.getrusage(
+            resource.RUSAGE_SELF).ru_maxrss
+
+    with open(args.output, mode="w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, mode="r") as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import metrics
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def records_digest(student_name, courses, scores):
+    """Hash of everything a student's chart is drawn from, so a cached image
+    is reused until that student's records change"""
+    digest = hashlib.sha256(student_name.encode("utf-8"))
+    for course, score in zip(courses, scores):
+        digest.update(b"\0" + str(course).encode("utf-8") +
+                      b"\0" + str(score).encode("ascii"))
+    return digest.hexdigest()[:32]
+
+
+class ChartCache:
+    """Least-recently-used cache of rendered chart bytes, capped by total
+    size in bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                metrics.count("charts.cache_misses")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.count("charts.cache_hits")
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+
+            self._entries[key] = data
+            self.size += len(data)
+
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_or_render(self, key, render):
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def __len__(self):
+        return len(self._entries)
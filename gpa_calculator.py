@@ -1,25 +1,241 @@
-def score_to_point(score):
-    if score >= 70:
-        return 5
-    elif score >= 60:
-        return 4
-    elif score >= 50:
-        return 3
-    elif score >= 45:
-        return 2
-    elif score >= 40:
-        return 1
-    else:
-        return 0
+import json
+import os
+from itertools import repeat
+
+import numpy as np
+
+import metrics
+
+
+# Classes of degree on the 5-point scale as (lowest GPA, name)
+DEFAULT_CLASSES = [
+    (0.0, "Fail"),
+    (1.0, "Pass"),
+    (1.5, "Third Class"),
+    (2.4, "2:2"),
+    (3.5, "2:1"),
+    (4.5, "First Class"),
+]
+
+
+class GradingScale:
+    """Score bands (minimum score, grade point, letter) compiled into
+    101-entry lookup tables, so converting a score is a single index.
+    classes are the classes of degree as (lowest GPA, name); without them
+    DEFAULT_CLASSES are stretched to the scale's top grade point"""
+
+    def __init__(self, bands, name="Default", weight_by_units=True,
+                 classes=None):
+        bands = sorted(((int(min_score), point, letter)
+                        for min_score, point, letter in bands), reverse=True)
+        if not bands or bands[-1][0] > 0:
+            raise ValueError("Grading scale must have a band starting at 0")
+
+        self.name = name
+        self.bands = bands
+        self.weight_by_units = weight_by_units
+        self.max_point = max(point for _, point, _ in bands)
+
+        if classes is None:
+            classes = [(min_gpa * self.max_point / 5, class_name)
+                       for min_gpa, class_name in DEFAULT_CLASSES]
+        classes = sorted((float(min_gpa), class_name)
+                         for min_gpa, class_name in classes)
+        if not classes or classes[0][0] > 0:
+            raise ValueError("Grading scale must have a class starting at 0")
+        self.classes = classes
+
+        self.points = []
+        self.letters = []
+        for score in range(101):
+            for min_score, point, letter in bands:
+                if score >= min_score:
+                    self.points.append(point)
+                    self.letters.append(letter)
+                    break
+
+        self.point_array = np.array(self.points)
+
+    def point(self, score):
+        return self.points[min(max(int(score), 0), 100)]
+
+    def letter(self, score):
+        return self.letters[min(max(int(score), 0), 100)]
+
+    @classmethod
+    def from_dict(cls, data):
+        bands = [(band["min_score"], band["point"], band.get("letter", ""))
+                 for band in data["bands"]]
+        classes = None
+        if "classes" in data:
+            classes = [(item["min_gpa"], item["name"])
+                       for item in data["classes"]]
+        return cls(bands, name=data.get("name", "Custom"),
+                   weight_by_units=data.get("weight_by_units", True),
+                   classes=classes)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, mode="r") as file:
+            return cls.from_dict(json.load(file))
+
+
+DEFAULT_SCALE = GradingScale([
+    (70, 5, "A"),
+    (60, 4, "B"),
+    (50, 3, "C"),
+    (45, 2, "D"),
+    (40, 1, "E"),
+    (0, 0, "F"),
+], name="Default 5-point", classes=DEFAULT_CLASSES)
+
+
+def load_grading_scale(path=None):
+    """Scale from the given JSON file, or the GRADING_SCALE_FILE environment
+    variable, falling back to DEFAULT_SCALE"""
+    path = path or os.environ.get("GRADING_SCALE_FILE")
+    if not path:
+        return DEFAULT_SCALE
+    return GradingScale.from_file(path)
+
+
+def credit_units(units):
+    """Credit units of a record from its credit_units value. Rows saved
+    before the credit_units column existed have none and count as 1 unit"""
+    return int(units or 1)
+
+
+def score_to_point(score, scale=None):
+    return (scale or DEFAULT_SCALE).point(score)
+
+
+class GpaAccumulator:
+    """Running sums of grade points x credit units and of credit units,
+    and the number of courses (scores) added. Accumulators for semesters
+    can be added together to get session or cumulative GPAs without going
+    back to the scores"""
 
+    __slots__ = ("points", "units", "count")
 
-def calculate_gpa(scores):
+    def __init__(self, points=0, units=0, count=0):
+        self.points = points
+        self.units = units
+        self.count = count
+
+    def add(self, score, units=1, scale=None):
+        scale = scale or DEFAULT_SCALE
+        if not scale.weight_by_units:
+            units = 1
+        self.points += scale.point(score) * units
+        self.units += units
+        self.count += 1
+
+    def __add__(self, other):
+        return GpaAccumulator(self.points + other.points,
+                              self.units + other.units,
+                              self.count + other.count)
+
+    @property
+    def gpa(self):
+        return gpa_from_totals(self.points, self.units)
+
+
+def combine_accumulators(accumulators):
+    return sum(accumulators, GpaAccumulator())
+
+
+@metrics.timed()
+def calculate_gpa(scores, scale=None, units=None):
     if len(scores) == 0:
         return 0.0
 
-    total_points = 0
-    for score in scores:
-        total_points += score_to_point(score)
+    accumulator = GpaAccumulator()
+    for score, unit in zip(scores, units if units is not None else repeat(1)):
+        accumulator.add(score, unit, scale)
 
-    gpa = total_points / len(scores)
+    return accumulator.gpa
+
+
+def gpa_from_totals(total_points, count):
+    if count == 0:
+        return 0.0
+
+    gpa = total_points / count
     return round(gpa, 2)
+
+
+def scores_to_points(scores, scale=None):
+    scores = np.asarray(scores, dtype=np.int64)
+    return (scale or DEFAULT_SCALE).point_array[np.clip(scores, 0, 100)]
+
+
+def group_totals(scores, group_ids, n_groups=None, scale=None, units=None):
+    """(grade points x units, units) summed per group for a flat array of
+    scores and a matching array of integer group ids (0..n_groups-1), as
+    NumPy arrays. Units count only on a scale that weights by them (1 each
+    if units is None). The one batch implementation behind calculate_gpas
+    and the all-students GPA totals"""
+    scale = scale or DEFAULT_SCALE
+    points = scores_to_points(scores, scale)
+    group_ids = np.asarray(group_ids, dtype=np.intp)
+    if n_groups is None:
+        n_groups = int(group_ids.max()) + 1 if group_ids.size else 0
+
+    if units is None or not scale.weight_by_units:
+        weights = np.ones(len(points), dtype=np.int64)
+    else:
+        weights = np.asarray(units, dtype=np.int64)
+    return (np.bincount(group_ids, weights=points * weights,
+                        minlength=n_groups),
+            np.bincount(group_ids, weights=weights, minlength=n_groups))
+
+
+def gpas_from_totals(point_totals, unit_totals):
+    """gpa_from_totals for arrays of totals: rounded GPA per group, 0.0 for
+    groups without units"""
+    totals = np.asarray(point_totals, dtype=np.float64)
+    counts = np.asarray(unit_totals, dtype=np.float64)
+    gpas = totals / np.maximum(counts, 1)
+    rounded = np.round(gpas, 2)
+
+    # np.round can differ from Python's round() on near-ties, so redo just
+    # those few with gpa_from_totals to match calculate_gpa exactly
+    scaled = gpas * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie).tolist():
+        rounded[i] = gpa_from_totals(float(totals[i]), int(counts[i]))
+
+    return rounded
+
+
+@metrics.timed()
+def calculate_gpas(scores, group_ids, n_groups=None, scale=None, units=None):
+    """GPA per group for a flat array of scores and a matching array of
+    integer group ids (0..n_groups-1), weighted by the matching credit
+    units like calculate_gpa (1 each if units is None). Groups with no
+    scores get 0.0"""
+    return gpas_from_totals(*group_totals(scores, group_ids, n_groups, scale,
+                                          units))
+
+
+@metrics.timed()
+def calculate_gpas_by_student(student_scores, scale=None, student_units=None):
+    """{student_name: gpa} for a {student_name: [scores]} dict in one batch,
+    with credit units from a matching {student_name: [units]} dict"""
+    names = list(student_scores)
+    lengths = [len(student_scores[name]) for name in names]
+    if not names:
+        return {}
+
+    total = sum(lengths)
+    scores = np.fromiter((score for name in names
+                          for score in student_scores[name]),
+                         dtype=np.int64, count=total)
+    units = None
+    if student_units is not None:
+        units = np.fromiter((unit for name in names
+                             for unit in student_units[name]),
+                            dtype=np.int64, count=total)
+    group_ids = np.repeat(np.arange(len(names)), lengths)
+    gpas = calculate_gpas(scores, group_ids, len(names), scale, units)
+    return dict(zip(names, gpas.tolist()))
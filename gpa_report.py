@@ -0,0 +1,51 @@
+import argparse
+import csv
+import sys
+import time
+
+import grade_manager
+
+
+def gpa_report(path=None, workers=None):
+    """Every student's CGPA in a records CSV (default: the app's own file)
+    or an archive in the same format, read straight from the file by
+    grade_manager.scan_term_totals. Returns ({student: CGPA}, seconds)"""
+    start = time.perf_counter()
+    totals = grade_manager.scan_term_totals(path, workers=workers)
+    return grade_manager.student_gpas(totals), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute every student's CGPA from a records CSV, "
+        "using one worker process per core for big files")
+    parser.add_argument("path", nargs="?", default=grade_manager.FILE_PATH,
+                        help="records CSV or archive (default: %(default)s)")
+    parser.add_argument("--workers", type=int,
+                        default=grade_manager.PARALLEL_SCAN_WORKERS,
+                        help="worker processes (default: %(default)s; "
+                        "1 scans serially)")
+    parser.add_argument("--output", metavar="CSV",
+                        help="write student_name,cgpa rows here instead of "
+                        "to standard output")
+    args = parser.parse_args()
+
+    gpas, seconds = gpa_report(args.path, args.workers)
+
+    if args.output:
+        file = open(args.output, mode="w", newline="")
+    else:
+        file = sys.stdout
+    try:
+        writer = csv.writer(file)
+        writer.writerow(["student_name", "cgpa"])
+        writer.writerows(sorted(gpas.items()))
+    finally:
+        if args.output:
+            file.close()
+
+    print(f"Computed {len(gpas)} GPAs in {seconds:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
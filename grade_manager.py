@@ -1,10 +1,94 @@
 import csv
+import functools
+import io
+import itertools
+import multiprocessing
+import operator
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from gpa_calculator import (DEFAULT_SCALE, GpaAccumulator,
+                            combine_accumulators, credit_units,
+                            gpas_from_totals)
+from locked_writer import CsvAppender, GroupCommit, open_prefix
+from name_index import NameIndex
+from record_store import RecordStore
+from snapshot import load_snapshot, save_snapshot
 
 # Get the parent directory (StudentGradeManager folder)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_FOLDER = os.path.join(BASE_DIR, "data")
 FILE_PATH = os.path.join(DATA_FOLDER, "students.csv")
+DB_PATH = os.path.join(DATA_FOLDER, "students.db")
+BULK_CHUNK_SIZE = 5000
+# Rows fetched from the backend at a time by iter_records
+STREAM_BATCH_SIZE = 1000
+# Loading this many rows from CSV text refreshes the binary snapshot
+SNAPSHOT_MIN_ROWS = 20000
+# Record files this big are totalled by several processes at once when
+# scan_term_totals runs in a single-threaded process (gpa_report.py);
+# GRADE_SCAN_WORKERS=1 turns that off
+PARALLEL_SCAN_MIN_BYTES = 16 * 1024 * 1024
+PARALLEL_SCAN_WORKERS = (int(os.environ.get("GRADE_SCAN_WORKERS") or 0)
+                         or os.cpu_count() or 1)
+FIELDNAMES = ["student_name", "course", "score", "level", "semester", "session",
+              "credit_units"]
+
+# Record file layouts, identified by their header. Version 1 is the original
+# three columns; 2 added the term columns and 3 added credit units
+SCHEMA_VERSION = 3
+SCHEMA_VERSIONS = {
+    1: FIELDNAMES[:3],
+    2: FIELDNAMES[:6],
+    3: FIELDNAMES,
+}
+
+# Records are tuples in FIELDNAMES order; these are their positions
+NAME, COURSE, SCORE, LEVEL, SEMESTER, SESSION, UNITS = range(len(FIELDNAMES))
+
+# Every record in a columnar RecordStore, plus the (path, mtime, size) of
+# the file (or the backend state) it was read from so outside edits trigger
+# a rebuild.
+_store = RecordStore()
+_store_key = None
+
+# Running {student_name: {(level, session, semester): GpaAccumulator}}
+# totals for the all-GPAs and per-student term views, tagged with the store
+# state and grading scale they were built from
+_gpa_totals = {}
+_gpa_totals_key = None
+_gpa_totals_scale = DEFAULT_SCALE
+# [totals, {normalized name: [names in totals]}, how many names are indexed];
+# totals only ever gain names, at the end
+_gpa_totals_names = None
+
+# Storage backend for records; None means the CSV file at FILE_PATH
+_backend = None
+
+# The index, totals and backend are shared by every thread in the process
+# (e.g. the web server), so public functions run one at a time
+_lock = threading.RLock()
+
+
+# Locked, journaled appender for FILE_PATH (see _csv_appender)
+_appender = None
+
+# Autocomplete indexes over the store's string tables, by field:
+# [table, NameIndex, how many of the table's values are indexed]. They have
+# their own lock so a keystroke never waits behind a load or a save
+NAME_INDEX_TABLES = {"student_name": "names", "course": "courses"}
+_name_indexes = {}
+_name_index_lock = threading.Lock()
+
+
+def _locked(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _lock:
+            return func(*args, **kwargs)
+    return wrapper
 
 
 def ensure_data_folder():
@@ -12,53 +96,794 @@ def ensure_data_folder():
         os.makedirs(DATA_FOLDER)
 
 
-def save_student_record(student_name, course, score):
+@_locked
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def use_sqlite(db_path=None):
+    from sqlite_store import SqliteBackend
+
+    set_backend(SqliteBackend(db_path or DB_PATH))
+
+
+@_locked
+def clear_cache():
+    """Forget the in-memory records and GPA totals, so the next load reads
+    the store (or its snapshot) again"""
+    global _store, _store_key, _gpa_totals, _gpa_totals_key
+
+    _store = RecordStore(_normalize)
+    _store_key = None
+    _gpa_totals = {}
+    _gpa_totals_key = None
+
+
+def _normalize(student_name):
+    return student_name.lower()
+
+
+def _file_key():
+    stat = os.stat(FILE_PATH)
+    return (FILE_PATH, stat.st_mtime_ns, stat.st_size)
+
+
+def _csv_appender():
+    global _appender
+    if _appender is None or _appender.path != FILE_PATH:
+        _appender = CsvAppender(FILE_PATH)
+    return _appender
+
+
+def _read_header():
+    with open(FILE_PATH, mode="r", newline="") as file:
+        return next(csv.reader(file), FIELDNAMES)
+
+
+def schema_version(header):
+    """The SCHEMA_VERSIONS entry a header matches, or None for a layout the
+    app did not write (e.g. reordered by a spreadsheet)"""
+    for version, columns in SCHEMA_VERSIONS.items():
+        if header == columns:
+            return version
+    return None
+
+
+def parse_records(file, **filters):
+    """Yield every record in an open records file as a tuple in FIELDNAMES
+    order. Column positions are looked up once from the header, so files of
+    any schema version (or column order) read the same; missing columns
+    come back as empty strings. Filters (see _row_filter) are checked on the
+    raw CSV rows, so skipped rows never become records"""
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    for field in FIELDNAMES[:SCORE + 1]:
+        if field not in header:
+            raise ValueError(f"Records file has no {field} column")
+
+    width = len(header)
+    padding = [""] * width
+    if header == FIELDNAMES:
+        # Current layout: each row already is the record
+        matches = _row_filter(range(width), **filters)
+        for row in reader:
+            if len(row) != width:
+                if not row:
+                    continue
+                row = (row + padding)[:width]
+            if matches is None or matches(row):
+                yield tuple(row)
+        return
+
+    # Older or reordered layouts: missing fields read an extra "" column
+    positions = [header.index(field) if field in header else width
+                 for field in FIELDNAMES]
+    pick = operator.itemgetter(*positions)
+    matches = _row_filter(positions, **filters) or bool
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != width:
+            row = (row + padding)[:width]
+        row.append("")
+        if matches(row):
+            yield pick(row)
+
+
+def _row_filter(positions, student_name=None, course=None, level=None,
+                semester=None, session=None, min_score=None, max_score=None):
+    """A predicate on raw CSV rows whose FIELDNAMES columns are at
+    positions, or None if no filter is given. Student names match
+    case-insensitively, like student lookups; scores are inclusive"""
+    key = None if student_name is None else _normalize(student_name)
+    name_at = positions[NAME]
+    score_at = positions[SCORE]
+    equal = [(positions[field], value) for field, value in
+             ((COURSE, course), (LEVEL, level), (SEMESTER, semester),
+              (SESSION, session)) if value is not None]
+    low = 0 if min_score is None else min_score
+    high = float("inf") if max_score is None else max_score
+    scored = min_score is not None or max_score is not None
+
+    if key is None and not equal and not scored:
+        return None
+
+    def matches(row):
+        if key is not None and _normalize(row[name_at]) != key:
+            return False
+        for position, value in equal:
+            if row[position] != value:
+                return False
+        return not scored or low <= int(row[score_at]) <= high
+
+    return matches
+
+
+def _matches(row, level=None, semester=None, session=None):
+    if level is not None and row[LEVEL] != level:
+        return False
+    if semester is not None and row[SEMESTER] != semester:
+        return False
+    if session is not None and row[SESSION] != session:
+        return False
+    return True
+
+
+def _get_store():
+    global _store, _store_key
+
+    if _backend is not None:
+        key = _backend_key()
+        if key != _store_key:
+            metrics.count("records.store_misses")
+            store = RecordStore(_normalize)
+            store.extend(_backend.all_rows())
+            metrics.count("records.rows_loaded", len(store))
+            _store = store
+            _store_key = key
+        else:
+            metrics.count("records.store_hits")
+        return _store
+
+    if not os.path.isfile(FILE_PATH):
+        if _store_key is not None or len(_store):
+            _store = RecordStore(_normalize)
+            _store_key = None
+        return _store
+
+    key = _file_key()
+    if key == _store_key:
+        metrics.count("records.store_hits")
+        return _store
+
+    metrics.count("records.store_misses")
+    with _csv_appender().reading():
+        key = _file_key()
+        store, covered = load_snapshot(_snapshot_path(), FILE_PATH,
+                                       _normalize)
+        if store is None:
+            store = RecordStore(_normalize)
+        else:
+            metrics.count("records.snapshot_rows", len(store))
+        parsed = len(store)
+        store.extend(_parse_tail(covered))
+        parsed = len(store) - parsed
+        metrics.count("records.rows_parsed", parsed)
+        metrics.count("records.bytes_read", key[2] - covered)
+
+        # Only rows saved since the snapshot are parsed on the next start
+        if parsed >= SNAPSHOT_MIN_ROWS:
+            try:
+                save_snapshot(store, _snapshot_path(), FILE_PATH, key[2],
+                              key[1])
+            except OSError:
+                pass
+
+    _store = store
+    _store_key = key
+    return _store
+
+
+def _snapshot_path():
+    return FILE_PATH + ".snapshot"
+
+
+def _parse_tail(offset):
+    """Records stored after byte offset in FILE_PATH (all of them for 0)"""
+    with open(FILE_PATH, mode="rb") as raw:
+        header = raw.readline()
+        raw.seek(offset)
+        with io.TextIOWrapper(raw, newline="") as file:
+            lines = file
+            if offset:
+                lines = itertools.chain(
+                    [header.decode(file.encoding)], file)
+            yield from parse_records(lines)
+
+
+def _fork_context():
+    # Forking copies only the calling thread: with other threads running
+    # (the GUI's jobs, the server's requests, a group commit) the child
+    # could inherit a lock one of them holds. Spawned workers would import
+    # main.py again, which builds the window at import time. So workers are
+    # only forked from a single-threaded process such as gpa_report.py
+    if ("fork" not in multiprocessing.get_all_start_methods()
+            or threading.active_count() > 1):
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def _byte_ranges(path, start, end, parts):
+    """Split bytes start:end of path into up to parts ranges, each starting
+    at the beginning of a line"""
+    bounds = [start]
+    with open(path, mode="rb") as file:
+        for part in range(1, parts):
+            file.seek(start + (end - start) * part // parts - 1)
+            file.readline()
+            bound = file.tell()
+            if bounds[-1] < bound < end:
+                bounds.append(bound)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _scan_range(path, header, start, end, scale):
+    """Term totals of the records in bytes start:end of path; one worker's
+    share of scan_term_totals"""
+    totals = {}
+    raw = open(path, mode="rb")
+    raw.seek(start)
+    with open_prefix(raw, end - start) as file:
+        lines = itertools.chain([header.decode(file.encoding)], file)
+        _add_to_totals(totals, parse_records(lines), scale)
+    return totals
+
+
+def _merge_totals(totals, partial):
+    for name, terms in partial.items():
+        merged = totals.get(name)
+        if merged is None:
+            totals[name] = terms
+            continue
+        for term, accumulator in terms.items():
+            merged[term] = merged[term] + accumulator if term in merged \
+                else accumulator
+
+
+def scan_term_totals(path=None, scale=None, workers=None, size=None):
+    """Per-student, per-term GPA accumulators (as load_gpa_totals) for a
+    records CSV - FILE_PATH or any archive in the same format - read
+    straight from the file, without building a store.
+
+    Files of PARALLEL_SCAN_MIN_BYTES or more are cut into line-aligned byte
+    ranges, one per worker process; each worker parses and totals its range
+    and the partial totals are merged. Smaller files, a single worker, a
+    platform without fork or a process running other threads (the GUI, the
+    server) scan serially. Only the first size bytes
+    are read (default: all). A line break inside a quoted field would be
+    cut in two, so the ranges assume fields without them, as the app
+    writes"""
+    path = path or FILE_PATH
+    scale = scale or DEFAULT_SCALE
+    workers = PARALLEL_SCAN_WORKERS if workers is None else workers
+
+    with open(path, mode="rb") as file:
+        header = file.readline()
+        start = file.tell()
+        end = os.fstat(file.fileno()).st_size if size is None else size
+    if end <= start:
+        return {}
+
+    context = _fork_context()
+    if end - start < PARALLEL_SCAN_MIN_BYTES or workers < 2 or context is None:
+        metrics.count("records.serial_scans")
+        return _scan_range(path, header, start, end, scale)
+
+    metrics.count("records.parallel_scans")
+    ranges = _byte_ranges(path, start, end, workers)
+    totals = {}
+    with ProcessPoolExecutor(len(ranges), mp_context=context) as pool:
+        for partial in pool.map(_scan_range, itertools.repeat(path),
+                                itertools.repeat(header),
+                                *zip(*ranges), itertools.repeat(scale)):
+            _merge_totals(totals, partial)
+    return totals
+
+
+def _student_rows(student_name, level=None, semester=None, session=None):
+    if _backend is not None:
+        rows = _backend.student_rows(student_name, level, semester, session)
+        metrics.count("records.rows_scanned", len(rows))
+        return rows
+
+    rows = _get_store().student_rows(student_name)
+    metrics.count("records.rows_scanned", len(rows))
+    return [row for row in rows if _matches(row, level, semester, session)]
+
+
+def validate_score(score):
+    """Scores must be whole numbers from 0 to 100"""
+    try:
+        score = int(score)
+        return 0 <= score <= 100
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_units(units):
+    """Credit units must be positive whole numbers"""
+    try:
+        return int(units) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def _make_row(student_name, course, score, level="", semester="", session="",
+              credit_units=1):
+    return (student_name, course, str(score), level, semester, session,
+            str(credit_units))
+
+
+def _row_units(row):
+    return credit_units(row[UNITS])
+
+
+def _backend_key():
+    return (id(_backend), _backend.data_version())
+
+
+def _add_to_totals(totals, rows, scale):
+    for row in rows:
+        name = row[NAME].strip()
+        if not name:
+            continue
+        terms = totals.setdefault(name, {})
+        term = (row[LEVEL], row[SESSION], row[SEMESTER])
+        accumulator = terms.get(term)
+        if accumulator is None:
+            accumulator = terms[term] = GpaAccumulator()
+        accumulator.add(int(row[SCORE]), _row_units(row), scale)
+
+
+def _upgrade_file():
+    """Rewrite FILE_PATH with the current columns first if it has an older
+    (or foreign) layout. Nothing is dropped: columns outside the schema
+    (e.g. remarks added in a spreadsheet) are kept after the schema's own,
+    and files that already start with the current columns are left alone.
+    The caller holds the appender lock. Returns True if the file was
+    rewritten"""
+    if not os.path.isfile(FILE_PATH) or os.path.getsize(FILE_PATH) == 0:
+        return False
+    header = _read_header()
+    if (schema_version(header) == SCHEMA_VERSION
+            or header[:len(FIELDNAMES)] == FIELDNAMES):
+        return False
+
+    for field in FIELDNAMES[:SCORE + 1]:
+        if field not in header:
+            raise ValueError(f"Records file has no {field} column")
+
+    # Known older versions only lack columns; anything else may also have
+    # columns of its own, which follow the schema's
+    width = len(header)
+    extras = [] if schema_version(header) else [
+        position for position, field in enumerate(header)
+        if field not in FIELDNAMES]
+    pick = operator.itemgetter(*[
+        header.index(field) if field in header else width
+        for field in FIELDNAMES] + extras)
+    padding = [""] * width
+
+    temp_path = FILE_PATH + ".upgrade"
+    try:
+        with open(FILE_PATH, mode="r", newline="") as source, \
+                open(temp_path, mode="w", newline="") as target:
+            reader = csv.reader(source)
+            next(reader)
+            writer = csv.writer(target)
+            writer.writerow(FIELDNAMES + [header[position]
+                                          for position in extras])
+            for row in reader:
+                if not row:
+                    continue
+                # Values past the header's last column are kept at the end
+                overflow = row[width:]
+                row = (row + padding)[:width]
+                row.append("")
+                writer.writerow(list(pick(row)) + overflow)
+            target.flush()
+            os.fsync(target.fileno())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, FILE_PATH)
+    return True
+
+
+@_locked
+def upgrade_records_file():
+    """Bring the records file up to SCHEMA_VERSION in place. Saves do this
+    automatically; returns True if the file needed it"""
+    with _csv_appender().locked():
+        return _upgrade_file()
+
+
+def _write_chunks(chunks):
+    """Append each chunk of rows to the active store, using one file handle
+    (or one transaction per chunk) for the whole batch"""
+    global _store_key, _gpa_totals_key
+
+    written = 0
+
+    if _backend is not None:
+        # Our own commits do not change the backend key
+        store_current = _store_key == _backend_key()
+        totals_current = store_current and _gpa_totals_key == _store_key
+        for chunk in chunks:
+            _backend.save_records(chunk)
+            written += len(chunk)
+            if store_current:
+                _store.extend(chunk)
+            if totals_current:
+                _add_to_totals(_gpa_totals, chunk, _gpa_totals_scale)
+        return written
+
+    appender = _csv_appender()
+
+    # Other processes (web server, importer) may append to the same file;
+    # the lock makes the header check, the append and the store key one step
+    with appender.locked():
+        file_exists = os.path.isfile(FILE_PATH)
+        store_current = (not file_exists and _store_key is None) or (
+            file_exists and _file_key() == _store_key)
+
+        # Older layouts are upgraded so new rows keep every column. The
+        # records read the same either way, so the store stays valid
+        if _upgrade_file() and store_current:
+            _store_key = _file_key()
+        totals_current = store_current and _gpa_totals_key == _store_key
+
+        # An empty file still needs its header
+        has_header = file_exists and os.path.getsize(FILE_PATH) > 0
+
+        for chunk in chunks:
+            appender.append(chunk, header=None if has_header else FIELDNAMES)
+            has_header = True
+            written += len(chunk)
+
+            # Keep the store in step with our own append instead of rescanning
+            if store_current:
+                _store.extend(chunk)
+
+            if totals_current:
+                _add_to_totals(_gpa_totals, chunk, _gpa_totals_scale)
+
+        if store_current and os.path.isfile(FILE_PATH):
+            _store_key = _file_key()
+        if totals_current:
+            _gpa_totals_key = _store_key
+
+    return written
+
+
+@_locked
+def _commit_rows(rows):
+    _write_chunks([rows])
+
+
+# Saves arriving while another thread is writing are committed together
+_group_commit = GroupCommit(_commit_rows)
+
+
+@metrics.timed()
+def save_student_record(student_name, course, score, level="", semester="",
+                        session="", credit_units=1):
     ensure_data_folder()
 
-    file_exists = os.path.isfile(FILE_PATH)
+    _group_commit.submit([_make_row(student_name, course, score, level,
+                                    semester, session, credit_units)])
+
+
+@metrics.timed()
+@_locked
+def save_student_records(records, chunk_size=BULK_CHUNK_SIZE):
+    """Save many records at once. Each record is a dict with student_name,
+    course and score (plus optional level, semester, session and
+    credit_units). Records with a missing name/course, a score outside 0-100
+    or non-positive credit units are skipped.
+    Returns (saved, rejected) counts"""
+    ensure_data_folder()
+
+    rejected = 0
+
+    def valid_chunks():
+        nonlocal rejected
+        chunk = []
+
+        for record in records:
+            units = record.get("credit_units") or 1
+            if (not record.get("student_name") or not record.get("course")
+                    or not validate_score(record.get("score"))
+                    or not validate_units(units)):
+                rejected += 1
+                continue
+
+            chunk.append(_make_row(
+                record["student_name"], record["course"],
+                int(record["score"]), record.get("level") or "",
+                record.get("semester") or "", record.get("session") or "",
+                int(units)))
 
-    with open(FILE_PATH, mode="a", newline="") as file:
-        writer = csv.writer(file)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
 
-        if not file_exists:
-            writer.writerow(["student_name", "course", "score"])
+        if chunk:
+            yield chunk
 
-        writer.writerow([student_name, course, score])
+    saved = _write_chunks(valid_chunks())
+    return saved, rejected
 
 
-def load_student_scores(student_name):
+@metrics.timed()
+@_locked
+def load_student_scores(student_name, level=None, semester=None, session=None):
     ensure_data_folder()
 
+    rows = _student_rows(student_name, level, semester, session)
+    return [int(row[SCORE]) for row in rows]
+
+
+@metrics.timed()
+@_locked
+def load_student_records(student_name, level=None, semester=None,
+                         session=None):
+    """The student's records as {column: value} dicts, in the order they
+    were saved. The lookup ignores case; names come back as saved"""
+    ensure_data_folder()
+
+    rows = _student_rows(student_name, level, semester, session)
+    return [dict(zip(FIELDNAMES, row)) for row in rows]
+
+
+@metrics.timed()
+@_locked
+def load_student_courses_and_scores(student_name, level=None, semester=None,
+                                    session=None):
+    ensure_data_folder()
+
+    courses = []
     scores = []
 
-    if not os.path.isfile(FILE_PATH):
-        return scores
+    for row in _student_rows(student_name, level, semester, session):
+        courses.append(row[COURSE])
+        scores.append(int(row[SCORE]))
 
-    with open(FILE_PATH, mode="r") as file:
-        reader = csv.DictReader(file)
+    return courses, scores
 
-        for row in reader:
-            if row["student_name"].lower() == student_name.lower():
-                scores.append(int(row["score"]))
 
-    return scores
+@metrics.timed()
+@_locked
+def load_record_store():
+    """Every record as a columnar RecordStore (see record_store.py). The
+    store is shared and kept up to date by saves, so treat it as read-only;
+    a different store is returned once the records change outside the app"""
+    ensure_data_folder()
+
+    return _get_store()
 
 
-def load_student_courses_and_scores(student_name):
+@metrics.timed()
+@_locked
+def load_all_records():
+    ensure_data_folder()
+
+    return _get_store().records()
+
+
+def iter_records(student_name=None, course=None, level=None, semester=None,
+                 session=None, min_score=None, max_score=None):
+    """Yield the matching records one at a time as tuples in FIELDNAMES
+    order, straight from the file or backend rather than the in-memory
+    store, so memory use does not grow with the number of records. Filters
+    are applied while parsing (or in the SQL query), before a record is
+    built; names match case-insensitively and the score range is inclusive.
+    Records saved after iteration starts are not included. See
+    aggregations.py for one-pass reports over the result"""
+    filters = {"student_name": student_name, "course": course,
+               "level": level, "semester": semester, "session": session,
+               "min_score": min_score, "max_score": max_score}
+
+    with _lock:
+        ensure_data_folder()
+        backend = _backend
+        if backend is not None:
+            cursor = backend.query_rows(**filters)
+        elif os.path.isfile(FILE_PATH):
+            appender = _csv_appender()
+        else:
+            return
+
+    if backend is not None:
+        # The connection is shared, so fetch under the lock, a batch at a time
+        while True:
+            with _lock:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+    # No lock is held while the caller works through the records
+    with appender.committed() as file:
+        yield from parse_records(file, **filters)
+
+
+@metrics.timed()
+@_locked
+def load_gpa_totals(scale=None):
+    """Per-student, per-term GPA accumulators. Saves made through
+    this module update them in place; they are rebuilt only when the records
+    change outside the app or a different grading scale is asked for"""
+    global _gpa_totals, _gpa_totals_key, _gpa_totals_scale
+
+    ensure_data_folder()
+    scale = scale or DEFAULT_SCALE
+
+    store = _get_store()
+    if (_store_key is None or _store_key != _gpa_totals_key
+            or scale is not _gpa_totals_scale):
+        metrics.count("gpa.totals_rebuilds")
+        metrics.count("records.rows_scanned", len(store))
+        _gpa_totals = store.term_totals(scale)
+        _gpa_totals_key = _store_key
+        _gpa_totals_scale = scale
+    else:
+        metrics.count("gpa.totals_hits")
+
+    return _gpa_totals
+
+
+def student_gpas(totals):
+    """{student: CGPA} from per-student, per-term accumulators (as
+    load_gpa_totals or scan_term_totals return)"""
+    combined = [combine_accumulators(terms.values())
+                for terms in totals.values()]
+    gpas = gpas_from_totals([total.points for total in combined],
+                            [total.units for total in combined])
+    return dict(zip(totals, gpas.tolist()))
+
+
+@metrics.timed()
+@_locked
+def load_all_student_gpas(scale=None):
+    return student_gpas(load_gpa_totals(scale))
+
+
+def _totals_names(student_name):
+    # Student lookups ignore case, the totals are by name as saved
+    global _gpa_totals_names
+    entry = _gpa_totals_names
+    if entry is None or entry[0] is not _gpa_totals:
+        entry = _gpa_totals_names = [_gpa_totals, {}, 0]
+    if len(_gpa_totals) > entry[2]:
+        for name in itertools.islice(_gpa_totals, entry[2], None):
+            entry[1].setdefault(_normalize(name), []).append(name)
+        entry[2] = len(_gpa_totals)
+    return entry[1].get(_normalize(student_name.strip()), ())
+
+
+@metrics.timed()
+@_locked
+def student_term_totals(student_name, level, session, scale=None):
+    """{semester: GpaAccumulator} for one student's level and session,
+    combined from the running totals (see load_gpa_totals) instead of going
+    through the student's records; each accumulator's count is the number
+    of courses. Add them up (combine_accumulators) for the session GPA"""
+    totals = load_gpa_totals(scale)
+    semesters = {}
+    for name in _totals_names(student_name):
+        for (term_level, term_session, semester), accumulator in \
+                totals[name].items():
+            if term_level == level and term_session == session:
+                semesters[semester] = semesters.get(
+                    semester, GpaAccumulator()) + accumulator
+    return semesters
+
+
+@metrics.timed()
+@_locked
+def query_student(student_name, level=None, session=None, scale=None):
+    """Courses, scores, per-semester GPAs and CGPA from one pass over the
+    student's records. Semester "1" of one level or session is not semester
+    "1" of another, so the per-semester groups are only filled in when both
+    level and session are given (and are empty otherwise)"""
     ensure_data_folder()
 
     courses = []
     scores = []
+    units = []
+    semester_scores = {}
+    semester_totals = {}
+    total = GpaAccumulator()
+    by_semester = level is not None and session is not None
 
-    if not os.path.isfile(FILE_PATH):
-        return courses, scores
+    for row in _student_rows(student_name, level=level, session=session):
+        score = int(row[SCORE])
+        row_units = _row_units(row)
+        courses.append(row[COURSE])
+        scores.append(score)
+        units.append(row_units)
+        total.add(score, row_units, scale)
+        if by_semester:
+            semester = row[SEMESTER]
+            semester_scores.setdefault(semester, []).append(score)
+            semester_totals.setdefault(semester, GpaAccumulator()).add(
+                score, row_units, scale)
 
-    with open(FILE_PATH, mode="r") as file:
-        reader = csv.DictReader(file)
+    semester_gpas = {semester: totals.gpa
+                     for semester, totals in semester_totals.items()}
 
-        for row in reader:
-            if row["student_name"].lower() == student_name.lower():
-                courses.append(row["course"])
-                scores.append(int(row["score"]))
+    return {
+        "courses": courses,
+        "scores": scores,
+        "units": units,
+        "semester_scores": semester_scores,
+        "semester_totals": semester_totals,
+        "semester_gpas": semester_gpas,
+        "cgpa": total.gpa,
+    }
 
-    return courses, scores
+
+def _name_index(field):
+    # The store only ever appends to its tables, so the index catches up by
+    # adding their new values; a new store (outside edits) starts over
+    table = getattr(_store, NAME_INDEX_TABLES[field])
+    entry = _name_indexes.get(field)
+    if entry is None or entry[0] is not table:
+        entry = _name_indexes[field] = [table, NameIndex(), 0]
+    added = table.values[entry[2]:]
+    if added:
+        entry[1].update(added)
+        entry[2] += len(added)
+    return entry[1]
+
+
+def _search_names(search, text, field, limit):
+    # Another thread building the index: nothing to offer this keystroke
+    if not _name_index_lock.acquire(blocking=False):
+        return []
+    try:
+        return search(_name_index(field), text, limit)
+    finally:
+        _name_index_lock.release()
+
+
+def complete_names(text, field="student_name", limit=10):
+    """Student names (or course codes, for field="course") that start with
+    text, or have a word that does, ignoring case. Answers from the records
+    already in memory without waiting for loads or saves, so it can run on
+    every keystroke; saved records show up straight away"""
+    return _search_names(NameIndex.complete, text, field, limit)
+
+
+def suggest_names(text, field="student_name", limit=5):
+    """Known names closest to a mistyped one, best first (see
+    complete_names)"""
+    return _search_names(NameIndex.suggest, text, field, limit)
+
+
+def update_name_indexes():
+    """Index the records in memory ahead of the first keystroke (the first
+    build for a large file takes a moment)"""
+    with _name_index_lock:
+        for field in NAME_INDEX_TABLES:
+            _name_index(field)
+
+
+if os.environ.get("GRADE_BACKEND", "csv").lower() == "sqlite":
+    use_sqlite()
@@ -0,0 +1,45 @@
+import argparse
+import csv
+import time
+
+import grade_manager
+
+
+def import_csv(path, chunk_size=grade_manager.BULK_CHUNK_SIZE):
+    """Bulk-load a CSV with student_name, course, score (and optional level,
+    semester, session) columns. Returns (saved, rejected, seconds)"""
+    start = time.perf_counter()
+
+    with open(path, mode="r", newline="") as file:
+        reader = csv.DictReader(file)
+        records = ({key: (value or "").strip() for key, value in row.items()
+                    if key is not None} for row in reader)
+        saved, rejected = grade_manager.save_student_records(
+            records, chunk_size=chunk_size)
+
+    return saved, rejected, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import a whole sitting of student scores from a CSV file")
+    parser.add_argument("path", help="CSV file to import")
+    parser.add_argument("--chunk-size", type=int,
+                        default=grade_manager.BULK_CHUNK_SIZE,
+                        help="rows written per flush (default: %(default)s)")
+    parser.add_argument("--sqlite", metavar="DB", nargs="?", const="",
+                        help="write to the SQLite backend (default database "
+                        "if no path is given)")
+    args = parser.parse_args()
+
+    if args.sqlite is not None:
+        grade_manager.use_sqlite(args.sqlite or None)
+
+    saved, rejected, seconds = import_csv(args.path, args.chunk_size)
+    rate = saved / seconds if seconds > 0 else 0.0
+    print(f"Imported {saved} records ({rejected} rejected) "
+          f"in {seconds:.2f}s - {rate:,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import itertools
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobRunner:
+    """Runs blocking work (file reads, GPA maths) on a small thread pool and
+    delivers results back on the Tk main loop.
+
+    Jobs submitted on the same channel supersede each other: only the newest
+    one's result is delivered, and older ones that have not started are
+    cancelled. Submitting the same key as the pending job on a channel reuses
+    that job instead of starting a duplicate, unless a job without a channel
+    (a save) was submitted since: the pending job may read data from before
+    it."""
+
+    def __init__(self, root, max_workers=2, poll_ms=25, on_busy_change=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_busy_change = on_busy_change
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="grade-job")
+        self._results = queue.Queue()
+        self._ids = itertools.count(1)
+        self._pending = {}   # job id -> (future, on_done, on_error)
+        self._channels = {}  # channel -> (job id, key)
+        self._polling = False
+
+    def submit(self, func, on_done, on_error=None, channel=None, key=None):
+        was_busy = bool(self._pending)
+
+        if channel is not None and channel in self._channels:
+            job_id, pending_key = self._channels[channel]
+            if key is not None and key == pending_key and job_id in self._pending:
+                future, _, _ = self._pending[job_id]
+                self._pending[job_id] = (future, on_done, on_error)
+                return job_id
+            self._cancel(job_id)
+
+        job_id = next(self._ids)
+        future = self._executor.submit(self._run, job_id, func)
+        self._pending[job_id] = (future, on_done, on_error)
+        if channel is not None:
+            self._channels[channel] = (job_id, key)
+        else:
+            # Jobs queued before this one must not be reused after it
+            for pending_channel, (pending_id, _) in self._channels.items():
+                self._channels[pending_channel] = (pending_id, None)
+
+        if not was_busy and self.on_busy_change:
+            self.on_busy_change(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job_id
+
+    def _run(self, job_id, func):
+        try:
+            self._results.put((job_id, True, func()))
+        except Exception as e:
+            self._results.put((job_id, False, e))
+
+    def _cancel(self, job_id):
+        job = self._pending.pop(job_id, None)
+        if job is not None:
+            job[0].cancel()
+
+    def _poll(self):
+        try:
+            self._deliver_results()
+        finally:
+            # Re-armed even if a callback failed, or no result would ever be
+            # delivered again
+            if self._pending:
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+                if self.on_busy_change:
+                    self.on_busy_change(False)
+
+    def _deliver_results(self):
+        while True:
+            try:
+                job_id, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            # Superseded jobs were dropped from _pending; ignore their results
+            job = self._pending.pop(job_id, None)
+            if job is None:
+                continue
+            for channel, (channel_job, _) in list(self._channels.items()):
+                if channel_job == job_id:
+                    del self._channels[channel]
+
+            _, on_done, on_error = job
+            try:
+                if ok:
+                    on_done(value)
+                elif on_error is not None:
+                    on_error(value)
+            except Exception:
+                # Reported like an error in any other Tk callback; the
+                # remaining results are still delivered
+                self.root.report_callback_exception(*sys.exc_info())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
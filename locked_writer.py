@@ -0,0 +1,208 @@
+import contextlib
+import csv
+import io
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, only in-process locking
+    fcntl = None
+
+# Last line of a fully written journal entry
+JOURNAL_END = "#end\n"
+
+
+class CsvAppender:
+    """Appends rows to a CSV file shared by several processes (the desktop
+    app, the web server, the importer).
+
+    Writers hold an exclusive fcntl lock on <path>.lock, so a header is only
+    ever written once and batches never interleave. Each batch is first
+    written to <path>.journal together with the file size it starts at; if
+    a writer dies mid-append, the next one to take the lock cuts the CSV back
+    to that size and replays the batch, so the file never ends in a torn
+    row."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.journal_path = path + ".journal"
+
+    @contextlib.contextmanager
+    def _flock(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file,
+                        fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Exclusive lock for appending; finishes any interrupted batch
+        first. append() must only be called inside this block"""
+        with self._flock(exclusive=True):
+            self.recover()
+            yield
+
+    @contextlib.contextmanager
+    def reading(self):
+        """Shared lock for reading the whole file"""
+        if self._journal_pending():
+            # A writer died mid-batch; repair the file before reading it
+            with self.locked():
+                yield
+        else:
+            with self._flock(exclusive=False):
+                yield
+
+    @contextlib.contextmanager
+    def committed(self):
+        """The file as a text stream holding only the batches already
+        written when it was opened. The lock is released straight away, so
+        a slow reader never holds up writers and never sees a batch that is
+        still being appended"""
+        with self.reading():
+            raw = open(self.path, mode="rb")
+            size = os.fstat(raw.fileno()).st_size
+        with open_prefix(raw, size) as file:
+            yield file
+
+    def _journal_pending(self):
+        try:
+            return os.path.getsize(self.journal_path) > 0
+        except OSError:
+            return False
+
+    def append(self, rows, header=None):
+        """Write one batch of row sequences (after the header, for a new
+        file)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header is not None:
+            writer.writerow(header)
+        writer.writerows(rows)
+        payload = buffer.getvalue()
+
+        offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        with open(self.journal_path, mode="w", newline="") as journal:
+            journal.write(f"{offset}\n{payload}{JOURNAL_END}")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+        self._apply(offset, payload)
+        self._clear_journal()
+
+    def recover(self):
+        """Replay a batch whose journal entry is complete. An incomplete
+        entry means the CSV was never touched, so it is just dropped.
+        Returns True if there was anything to clean up"""
+        try:
+            with open(self.journal_path, mode="r", newline="") as journal:
+                entry = journal.read()
+        except FileNotFoundError:
+            return False
+        if not entry:
+            return False
+
+        if entry.endswith(JOURNAL_END):
+            offset, _, payload = entry[:-len(JOURNAL_END)].partition("\n")
+            self._apply(int(offset), payload)
+        self._clear_journal()
+        return True
+
+    def _apply(self, offset, payload):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > offset:
+            os.truncate(self.path, offset)
+
+        with open(self.path, mode="a", newline="") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _clear_journal(self):
+        with open(self.journal_path, mode="w"):
+            pass
+
+
+def open_prefix(raw, size):
+    """Text stream (newline="" for csv) over the next size bytes of the
+    binary file raw, which is closed with it"""
+    return io.TextIOWrapper(io.BufferedReader(_Prefix(raw, size)),
+                            newline="")
+
+
+class _Prefix(io.RawIOBase):
+    """Reads only the first size bytes of a binary file"""
+
+    def __init__(self, raw, size):
+        self._raw = raw
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        with memoryview(buffer) as view:
+            read = self._raw.readinto(view[:size])
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+
+class GroupCommit:
+    """Batches rows from concurrent callers. A caller that arrives while a
+    commit is running waits; the first waiter then commits everything queued
+    in the meantime with a single commit(rows) call, so N concurrent saves
+    cost one lock and fsync instead of N"""
+
+    def __init__(self, commit):
+        self._commit = commit
+        self._condition = threading.Condition()
+        self._queued = []  # [rows, done, error] per caller
+        self._committing = False
+
+    def submit(self, rows):
+        """Commit rows (with whatever else is queued); blocks until done and
+        re-raises the commit's exception, if any"""
+        entry = [rows, False, None]
+
+        with self._condition:
+            self._queued.append(entry)
+            while self._committing and not entry[1]:
+                self._condition.wait()
+            if entry[1]:
+                if entry[2] is not None:
+                    raise entry[2]
+                return
+
+            self._committing = True
+            batch, self._queued = self._queued, []
+
+        error = None
+        try:
+            self._commit([row for queued in batch for row in queued[0]])
+        except Exception as exc:
+            error = exc
+        finally:
+            with self._condition:
+                for queued in batch:
+                    queued[1] = True
+                    queued[2] = error
+                self._committing = False
+                self._condition.notify_all()
+
+        if error is not None:
+            raise error
@@ -1,8 +1,9 @@
+import startup_timing  # first, so the startup clock covers everything below
 import tkinter as tk
 from tkinter import messagebox, ttk
 import sys
 import os
-import csv
+import threading
 
 # Add src directory to path for dynamic imports
 _src_path = os.path.join(os.path.dirname(__file__), 'src')
@@ -10,14 +11,29 @@ if _src_path not in sys.path:
     sys.path.insert(0, _src_path)
 
 try:
-    from grade_manager import (  # type: ignore
-        save_student_record,
-        load_student_scores,
-        load_student_courses_and_scores,
-        FILE_PATH
-    )
-    from gpa_calculator import calculate_gpa  # type: ignore
-    from visualization import show_score_chart, show_all_gpas_chart  # type: ignore
+    with startup_timing.timed("import grade_manager"):
+        from grade_manager import (  # type: ignore
+            save_student_record,
+            load_student_courses_and_scores,
+            load_record_store,
+            load_all_student_gpas,
+            query_student,
+            student_term_totals,
+            validate_score,
+            validate_units,
+            complete_names,
+            suggest_names,
+            update_name_indexes
+        )
+    with startup_timing.timed("import gpa_calculator"):
+        from gpa_calculator import (  # type: ignore
+            combine_accumulators,
+            load_grading_scale
+        )
+    with startup_timing.timed("import jobs"):
+        from jobs import JobRunner  # type: ignore
+    import metrics  # type: ignore
+    from autocomplete import Autocomplete  # type: ignore
 except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
@@ -39,39 +55,41 @@ BORDER_COLOR = "#e0e8f0"  # Light borders for glass
 LIGHT_BG = "#2a3a55"
 ACCENT = "#a8bfff"
 
+# Set GRADE_PREWARM_CHARTS=0 to skip loading matplotlib in the background
+# once the window is up
+PREWARM_CHARTS = os.environ.get("GRADE_PREWARM_CHARTS", "1") != "0"
+
 # Global variables
-all_records = []
+visualization_module = None
+chart_panel = None
+visualization_lock = threading.Lock()
+grading_scale = load_grading_scale()
+records_store = None  # RecordStore shown in records_tree
+records_shown = 0  # how many of its rows are in records_tree
+records_total = 0  # its length when last shown
+records_page_pending = False
 active_tab = "save"
+RECORDS_PAGE_SIZE = 200
+# F9 starts and stops a cProfile capture of the app's timed calls
+PROFILE_PATH = os.environ.get("GRADE_PROFILE_PATH", "grade_profile.prof")
 
 
-def get_all_student_gpas():
-    """Calculate GPA for each unique student"""
-    student_gpas = {}
-    student_scores = {}
-
-    if not os.path.exists(FILE_PATH):
-        return student_gpas
-
-    try:
-        with open(FILE_PATH, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                name = row.get('student_name', '').strip()
-                if not name:
-                    continue
-                score = int(row.get('score', 0))
-
-                if name not in student_scores:
-                    student_scores[name] = []
-                student_scores[name].append(score)
-    except:
-        pass
+def load_visualization():
+    """Import the chart module (and with it matplotlib) on first use. The
+    lock makes a chart request wait for a prewarm that is still importing"""
+    global visualization_module
+    with visualization_lock:
+        if visualization_module is None:
+            with startup_timing.timed("import visualization"):
+                import visualization  # type: ignore
+            visualization_module = visualization
+    return visualization_module
 
-    # Calculate GPA for each student
-    for name, scores in student_scores.items():
-        student_gpas[name] = calculate_gpa(scores)
 
-    return student_gpas
+@metrics.timed()
+def get_all_student_gpas():
+    """GPA for each unique student, from the cached running totals"""
+    return load_all_student_gpas(scale=grading_scale)
 
 
 def create_frosted_glass_effect(widget):
@@ -83,33 +101,44 @@ def create_frosted_glass_effect(widget):
     )
 
 
-def create_gradient_bg(canvas, color1="#667eea", color2="#764ba2", width=900, height=200):
-    """Create gradient background with smooth transition"""
+# Gradient images by (color1, color2, width, height); keeping a reference
+# here also stops Tk from discarding the image
+_gradient_cache = {}
+
+
+def gradient_image(master, color1, color2, width, height):
+    """Vertical gradient with the top-third shine baked in, built once"""
+    key = (color1, color2, width, height)
+    if key in _gradient_cache:
+        return _gradient_cache[key]
+
     r1, g1, b1 = int(color1[1:3], 16), int(
         color1[3:5], 16), int(color1[5:7], 16)
     r2, g2, b2 = int(color2[1:3], 16), int(
         color2[3:5], 16), int(color2[5:7], 16)
 
+    rows = []
     for i in range(height):
         ratio = i / height
         r = int(r1 + (r2 - r1) * ratio)
         g = int(g1 + (g2 - g1) * ratio)
         b = int(b1 + (b2 - b1) * ratio)
-        color = f'#{r:02x}{g:02x}{b:02x}'
-        canvas.create_line(0, i, width, i, fill=color, width=1)
+        # Subtle shine/glow, like the old 12% white stipple over the top third
+        if i < height // 3:
+            r, g, b = (int(c + (255 - c) * 0.125) for c in (r, g, b))
+        rows.append(f'{{#{r:02x}{g:02x}{b:02x}}}')
 
-    # Add subtle shine/glow overlay
-    canvas.create_rectangle(0, 0, width, height//3,
-                            fill='white', stipple='gray12', outline='')
+    # One column of row colours, tiled across the full width in a single put
+    image = tk.PhotoImage(master=master, width=width, height=height)
+    image.put(' '.join(rows), to=(0, 0, width, height))
+    _gradient_cache[key] = image
+    return image
 
 
-def validate_score(score_str):
-    """Validate score input"""
-    try:
-        score = int(score_str)
-        return 0 <= score <= 100
-    except ValueError:
-        return False
+def create_gradient_bg(canvas, color1="#667eea", color2="#764ba2", width=900, height=200):
+    """Draw the cached gradient background as a single canvas item"""
+    image = gradient_image(canvas, color1, color2, width, height)
+    return canvas.create_image(0, 0, anchor='nw', image=image)
 
 
 def on_score_change(*args):
@@ -129,38 +158,65 @@ def on_score_change(*args):
 
 
 def load_saved_records():
-    """Load and display saved records"""
-    global all_records
-    all_records = []
+    """Load saved records in the background, then display them"""
+    jobs.submit(load_records_and_names, show_records,
+                on_error=show_job_error, channel="records", key="all")
 
-    if not os.path.exists(FILE_PATH):
-        return
 
-    try:
-        with open(FILE_PATH, 'r') as f:
-            reader = csv.DictReader(f)
-            if reader:
-                all_records = list(reader)
-    except:
-        pass
+def load_records_and_names():
+    # Build the autocomplete indexes while still in the background
+    store = load_record_store()
+    update_name_indexes()
+    return store
+
 
-    update_records_display()
+def show_records(store):
+    """Show a record store in the table. If it is the store already shown
+    (saves append to it in place), only the new rows are added"""
+    global records_store, records_total
+    if store is records_store:
+        if records_shown == records_total:
+            show_more_records()
+    else:
+        records_store = store
+        update_records_display()
+    records_total = len(store)
 
 
+@metrics.timed()
 def update_records_display():
-    """Update the records treeview"""
-    for item in records_tree.get_children():
-        records_tree.delete(item)
+    """Reset the records treeview and show the first page of records"""
+    global records_shown
+    records_tree.delete(*records_tree.get_children())
+    records_shown = 0
+    show_more_records()
+
+
+def insert_record_row(record):
+    # Records are (name, course, score, level, semester, session, units)
+    records_tree.insert('', 'end', values=record)
+
+
+@metrics.timed()
+def show_more_records():
+    """Add the next page of records to the treeview"""
+    global records_shown, records_page_pending
+    records_page_pending = False
+    end = min(records_shown + RECORDS_PAGE_SIZE, len(records_store))
+    for index in range(records_shown, end):
+        insert_record_row(records_store.row(index))
+    records_shown = end
+
 
-    for record in all_records:
-        records_tree.insert('', 'end', values=(
-            record.get('student_name', ''),
-            record.get('course', ''),
-            record.get('score', ''),
-            record.get('level', ''),
-            record.get('semester', ''),
-            record.get('session', '')
-        ))
+def on_records_scroll(first, last):
+    """Keep the scrollbar in sync and load another page near the bottom"""
+    global records_page_pending
+    tree_scroll.set(first, last)
+    if (float(last) > 0.9 and records_store is not None
+            and records_shown < len(records_store)
+            and not records_page_pending):
+        records_page_pending = True
+        window.after_idle(show_more_records)
 
 
 def save_record():
@@ -171,6 +227,7 @@ def save_record():
     level = level_var.get().strip()
     semester = semester_var.get().strip()
     session_val = session_entry.get().strip()
+    units = units_entry.get().strip() or "1"
 
     if not name or not course or not score:
         show_message("⚠️ All fields are required!", "error")
@@ -180,13 +237,27 @@ def save_record():
         show_message("❌ Score must be between 0-100!", "error")
         return
 
+    if not validate_units(units):
+        show_message("❌ Credit units must be a whole number above 0!", "error")
+        return
+
     score_val = int(score)
-    save_student_record(name, course, score_val, level=level,
-                        semester=semester, session=session_val)
-    show_message(f"✅ Record saved! {name} - {course}: {score_val}", "success")
 
-    clear_form()
-    load_saved_records()
+    def save():
+        save_student_record(name, course, score_val, level=level,
+                            semester=semester, session=session_val,
+                            credit_units=int(units))
+        return load_record_store()
+
+    # The form is only cleared once the record is saved, so a failed save
+    # leaves the input there to retry
+    def done(store):
+        show_message(
+            f"✅ Record saved! {name} - {course}: {score_val}", "success")
+        show_records(store)
+        clear_form()
+
+    jobs.submit(save, done, on_error=show_job_error)
 
 
 def clear_form():
@@ -199,6 +270,7 @@ def clear_form():
     level_var.set("")
     semester_var.set("")
     session_entry.delete(0, tk.END)
+    units_entry.delete(0, tk.END)
 
 
 def show_chart():
@@ -208,13 +280,17 @@ def show_chart():
         show_message("⚠️ Enter student name!", "error")
         return
 
-    courses, scores = load_student_courses_and_scores(name)
+    def done(result):
+        courses, scores = result
+        if not scores:
+            show_message(no_records_message(name), "error")
+            return
 
-    if not scores:
-        show_message("❌ No records found for this student!", "error")
-        return
+        switch_tab("chart")
+        get_chart_panel().show_scores(name, courses, scores)
 
-    show_score_chart(name, courses, scores)
+    jobs.submit(lambda: load_student_courses_and_scores(name), done,
+                on_error=show_job_error, channel="chart", key=name.lower())
 
 
 def calculate_student_gpa():
@@ -224,25 +300,31 @@ def calculate_student_gpa():
         show_message("⚠️ Enter student name!", "error")
         return
 
-    scores = load_student_scores(name)
+    def done(summary):
+        scores = summary["scores"]
 
-    if not scores:
-        show_message("❌ No records found for this student!", "error")
-        return
+        if not scores:
+            show_message(no_records_message(name), "error")
+            return
 
-    gpa = calculate_gpa(scores)
-    gpa_value_label.config(text=f"{gpa}", fg=ACCENT)
-    gpa_count_label.config(text=f"({len(scores)} scores)")
-    gpa_result_frame.pack(pady=20, fill=tk.X, padx=25)
+        gpa = summary["cgpa"]
+        gpa_value_label.config(text=f"{gpa}", fg=ACCENT)
+        gpa_count_label.config(text=f"({len(scores)} scores)")
+        gpa_result_frame.pack(pady=20, fill=tk.X, padx=25)
 
-    # Load and display student's courses and scores
-    courses, scores_list = load_student_courses_and_scores(name)
-    load_student_records_display(courses, scores_list)
-    student_records_frame.pack(pady=20, fill=tk.BOTH, expand=True, padx=25)
+        # Display student's courses and scores from the same query
+        load_student_records_display(summary["courses"], scores)
+        student_records_frame.pack(
+            pady=20, fill=tk.BOTH, expand=True, padx=25)
 
-    show_message(f"✓ GPA calculated for {name}!", "success")
+        show_message(f"✓ GPA calculated for {name}!", "success")
 
+    jobs.submit(lambda: query_student(name, scale=grading_scale), done,
+                on_error=show_job_error, channel="student_gpa",
+                key=name.lower())
 
+
+@metrics.timed()
 def load_student_records_display(courses, scores):
     """Display student's course records"""
     for item in student_records_tree.get_children():
@@ -254,24 +336,97 @@ def load_student_records_display(courses, scores):
 
 def load_all_gpas_display():
     """Load and display all students' GPAs"""
-    for item in gpa_tree.get_children():
-        gpa_tree.delete(item)
+    @metrics.timed("main.gpa_tree_refresh")
+    def done(student_gpas):
+        for item in gpa_tree.get_children():
+            gpa_tree.delete(item)
 
-    student_gpas = get_all_student_gpas()
+        for name, gpa in sorted(student_gpas.items()):
+            gpa_tree.insert('', 'end', values=(name, f"{gpa:.2f}"))
 
-    for name, gpa in sorted(student_gpas.items()):
-        gpa_tree.insert('', 'end', values=(name, f"{gpa:.2f}"))
+    jobs.submit(get_all_student_gpas, done, on_error=show_job_error,
+                channel="all_gpas", key="all")
 
 
 def show_all_gpas():
     """Show chart of all student GPAs"""
-    student_gpas = get_all_student_gpas()
+    def done(student_gpas):
+        if not student_gpas:
+            show_message("❌ No GPA records found!", "error")
+            return
+
+        switch_tab("chart")
+        get_chart_panel().show_gpas(student_gpas, mode, grading_scale)
 
-    if not student_gpas:
-        show_message("❌ No GPA records found!", "error")
+    mode = GPA_CHART_MODES.get(gpa_chart_mode_var.get(), "auto")
+
+    jobs.submit(get_all_student_gpas, done, on_error=show_job_error,
+                channel="all_gpas_chart", key="all")
+
+
+def get_chart_panel():
+    """The embedded chart in the View Chart tab, created on first use"""
+    global chart_panel
+    if chart_panel is None:
+        chart_panel = load_visualization().ChartPanel(chart_panel_frame)
+        chart_panel.widget.pack(fill=tk.BOTH, expand=True)
+    return chart_panel
+
+
+def show_job_error(error):
+    show_message(f"❌ Error: {error}", "error")
+
+
+def on_first_paint():
+    """Record time to first paint, then warm up the chart module"""
+    window.update_idletasks()
+    startup_timing.mark("first paint")
+
+    if not PREWARM_CHARTS:
+        startup_timing.report()
         return
 
-    show_all_gpas_chart(student_gpas)
+    def prewarm():
+        load_visualization()
+        startup_timing.report()
+
+    threading.Thread(target=prewarm, daemon=True).start()
+
+
+def no_records_message(name, message="❌ No records found for this student!"):
+    """message, plus the closest saved names if name is not one of them"""
+    suggestions = suggest_names(name, limit=3)
+    if not suggestions or suggestions[0].lower() == name.lower():
+        return message
+    return f"{message} Did you mean {', '.join(suggestions)}?"
+
+
+def add_autocomplete(entry, field="student_name"):
+    """Offer saved student names (or course codes) as the user types"""
+    Autocomplete(entry, lambda text: complete_names(text, field),
+                 font=("Segoe UI", 11), fg=INPUT_FG, bg=INPUT_BG,
+                 select_bg=PRIMARY_COLOR, select_fg=WHITE)
+
+
+def toggle_profiling(event=None):
+    """Start a cProfile capture, or stop it and save the profile and the
+    metrics collected so far next to it"""
+    if not metrics.is_profiling():
+        metrics.start_profile()
+        show_message("⏺ Profiling... press F9 again to stop", "success")
+        return
+
+    if metrics.stop_profile(PROFILE_PATH):
+        metrics.dump(os.path.splitext(PROFILE_PATH)[0] + "_metrics.json")
+        show_message(f"✓ Profile saved to {PROFILE_PATH}", "success")
+    else:
+        show_message("⚠️ Nothing was profiled", "error")
+
+
+def set_busy(busy):
+    """Show the busy indicator while background jobs are running"""
+    busy_label.config(text="⏳ Working..." if busy else "")
+    window.config(cursor="watch" if busy else "")
 
 
 def show_message(msg, msg_type):
@@ -323,12 +478,18 @@ window.title("Student Grade Management System")
 window.geometry("950x850")
 window.resizable(False, False)
 window.configure(bg=BG_COLOR)
+startup_timing.mark("window created")
 
 try:
     window.attributes('-alpha', 0.98)
 except:
     pass
 
+# File reads and GPA maths run here instead of on the Tk main loop. One
+# worker is enough (grade_manager serves one call at a time) and keeps
+# saves in the order they were made.
+jobs = JobRunner(window, max_workers=1, on_busy_change=set_busy)
+
 # ============= HEADER WITH GRADIENT & GLOW =============
 header_frame = tk.Frame(window, bg=BG_COLOR, height=220)
 header_frame.pack(side=tk.TOP, fill=tk.X)
@@ -434,6 +595,10 @@ for i, (text, icon, cmd) in enumerate([
 
     tab_button_refs.append((btn, ["save", "gpa", "chart", "grade"][i]))
 
+busy_label = tk.Label(tab_frame, text="", font=("Segoe UI", 10, "bold"),
+                      fg=ACCENT, bg=GLASS_BG)
+busy_label.pack(side=tk.RIGHT, padx=15)
+
 # Message frame
 message_frame = tk.Frame(content_frame, bg=GLASS_BG)
 message_label = tk.Label(
@@ -483,6 +648,7 @@ def on_name_unfocus(event):
 
 name_entry.bind('<FocusIn>', on_name_focus)
 name_entry.bind('<FocusOut>', on_name_unfocus)
+add_autocomplete(name_entry)
 
 # Course
 course_label = tk.Label(form_frame, text="📚 Course Name:", font=(
@@ -503,6 +669,7 @@ def on_course_unfocus(event):
 
 course_entry.bind('<FocusIn>', on_course_focus)
 course_entry.bind('<FocusOut>', on_course_unfocus)
+add_autocomplete(course_entry, "course")
 
 # Score
 score_label = tk.Label(form_frame, text="⭐ Score (0-100):",
@@ -582,6 +749,14 @@ session_entry = tk.Entry(form_frame, font=("Segoe UI", 11), fg=INPUT_FG,
                          bg=INPUT_BG, relief=tk.FLAT, bd=1, insertbackground=PRIMARY_COLOR)
 session_entry.pack(fill=tk.X, ipady=8, padx=20, pady=(0, 12))
 
+# Credit units field
+units_label = tk.Label(form_frame, text="🎓 Credit Units (default 1):",
+                       font=("Segoe UI", 11, "bold"), fg=TEXT_COLOR, bg=GLASS_BG)
+units_label.pack(anchor=tk.W, pady=(10, 4), padx=20)
+units_entry = tk.Entry(form_frame, font=("Segoe UI", 11), fg=INPUT_FG,
+                       bg=INPUT_BG, relief=tk.FLAT, bd=1, insertbackground=PRIMARY_COLOR)
+units_entry.pack(fill=tk.X, ipady=8, padx=20, pady=(0, 12))
+
 # Buttons
 button_frame = tk.Frame(form_frame, bg=GLASS_BG)
 button_frame.pack(fill=tk.X, padx=20, pady=(20, 0))
@@ -732,7 +907,7 @@ tree_scroll = ttk.Scrollbar(tree_frame)
 tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
 records_tree = ttk.Treeview(tree_frame, columns=('Student', 'Course', 'Score',
-                            'Level', 'Semester', 'Session'), height=6, yscrollcommand=tree_scroll.set)
+                            'Level', 'Semester', 'Session', 'Units'), height=6, yscrollcommand=on_records_scroll)
 tree_scroll.config(command=records_tree.yview)
 
 records_tree.column('#0', width=0, stretch=tk.NO)
@@ -742,6 +917,7 @@ records_tree.column('Score', anchor=tk.CENTER, width=80)
 records_tree.column('Level', anchor=tk.CENTER, width=80)
 records_tree.column('Semester', anchor=tk.CENTER, width=80)
 records_tree.column('Session', anchor=tk.W, width=120)
+records_tree.column('Units', anchor=tk.CENTER, width=60)
 
 records_tree.heading('#0', text='', anchor=tk.W)
 records_tree.heading('Student', text='Student Name', anchor=tk.W)
@@ -750,6 +926,7 @@ records_tree.heading('Score', text='Score', anchor=tk.CENTER)
 records_tree.heading('Level', text='Level', anchor=tk.CENTER)
 records_tree.heading('Semester', text='Semester', anchor=tk.CENTER)
 records_tree.heading('Session', text='Session', anchor=tk.W)
+records_tree.heading('Units', text='Units', anchor=tk.CENTER)
 
 records_tree.pack(fill=tk.BOTH, expand=True)
 
@@ -793,6 +970,7 @@ def on_gpa_name_unfocus(event):
 
 gpa_name_entry.bind('<FocusIn>', on_gpa_name_focus)
 gpa_name_entry.bind('<FocusOut>', on_gpa_name_unfocus)
+add_autocomplete(gpa_name_entry)
 
 
 def calculate_gpa_from_entry():
@@ -910,6 +1088,7 @@ def on_chart_name_unfocus(event):
 
 chart_name_entry.bind('<FocusIn>', on_chart_name_focus)
 chart_name_entry.bind('<FocusOut>', on_chart_name_unfocus)
+add_autocomplete(chart_name_entry)
 
 
 def show_chart_from_entry():
@@ -917,7 +1096,6 @@ def show_chart_from_entry():
     name_entry.delete(0, tk.END)
     name_entry.insert(0, name)
     show_chart()
-    switch_tab("save")
 
 
 chart_btn = tk.Button(
@@ -958,6 +1136,22 @@ all_gpas_section_label = tk.Label(chart_tab, text="📊 View All Students' GPAs"
     "Segoe UI", 12, "bold"), fg=TEXT_COLOR, bg=GLASS_BG)
 all_gpas_section_label.pack(anchor=tk.W, padx=20, pady=(0, 10))
 
+# Large cohorts are charted as a distribution instead of one bar each
+GPA_CHART_MODES = {
+    "Auto": "auto",
+    "Every student": "all",
+    "GPA distribution": "histogram",
+    "Class of degree": "bands",
+    "Top 20": "top",
+    "Bottom 20": "bottom",
+}
+gpa_chart_mode_var = tk.StringVar()
+gpa_chart_mode_menu = ttk.Combobox(chart_tab, values=tuple(GPA_CHART_MODES),
+                                   textvariable=gpa_chart_mode_var,
+                                   state="readonly")
+gpa_chart_mode_menu.set("Auto")
+gpa_chart_mode_menu.pack(fill=tk.X, padx=20, pady=(0, 10))
+
 chart_all_gpas_btn = tk.Button(
     chart_tab,
     text="📈 Show All Students' GPA Chart",
@@ -974,6 +1168,10 @@ chart_all_gpas_btn = tk.Button(
 )
 chart_all_gpas_btn.pack(fill=tk.X, padx=20, pady=(0, 20))
 
+# Embedded chart, reused for every student and the all-GPAs chart
+chart_panel_frame = tk.Frame(chart_tab, bg=GLASS_BG)
+chart_panel_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+
 # ============= GRADE MANAGER TAB =============
 grade_tab = tk.Frame(content_frame, bg=GLASS_BG)
 
@@ -990,6 +1188,7 @@ gm_label.pack(anchor=tk.W, pady=(20, 8), padx=20)
 gm_name_entry = tk.Entry(gm_frame, font=("Segoe UI", 11), fg=INPUT_FG,
                          bg=INPUT_BG, relief=tk.FLAT, bd=1, insertbackground=PRIMARY_COLOR)
 gm_name_entry.pack(fill=tk.X, ipady=12, padx=20)
+add_autocomplete(gm_name_entry)
 
 # Level select
 gm_level_label = tk.Label(gm_frame, text="🏷️ Level:", font=(
@@ -1033,15 +1232,20 @@ def gm_calculate_semester():
         show_message('⚠️ Name, level, session and semester required', 'error')
         return
 
-    scores = load_student_scores(
-        name, level=level, semester=semester, session=session_val)
-    if not scores:
-        show_message('❌ No records found for this selection', 'error')
-        return
-    gpa = calculate_gpa(scores)
-    gm_result_var.set(
-        f"Semester {semester} GPA: {gpa} ({len(scores)} course(s))")
-    show_message('✓ Semester GPA calculated', 'success')
+    def done(semesters):
+        totals = semesters.get(semester)
+        if totals is None:
+            show_message(no_records_message(
+                name, '❌ No records found for this selection'), 'error')
+            return
+        gm_result_var.set(
+            f"Semester {semester} GPA: {totals.gpa} ({totals.count} course(s))")
+        show_message('✓ Semester GPA calculated', 'success')
+
+    jobs.submit(lambda: student_term_totals(name, level, session_val,
+                                            scale=grading_scale),
+                done, on_error=show_job_error, channel="grade_manager",
+                key=(name.lower(), level, session_val, semester))
 
 
 def gm_calculate_session():
@@ -1053,17 +1257,20 @@ def gm_calculate_session():
         show_message('⚠️ Name, level and session required', 'error')
         return
 
-    s1 = load_student_scores(
-        name, level=level, semester='1', session=session_val)
-    s2 = load_student_scores(
-        name, level=level, semester='2', session=session_val)
-    gpa1 = calculate_gpa(s1)
-    gpa2 = calculate_gpa(s2)
-    combined = s1 + s2
-    cgpa = calculate_gpa(combined) if combined else 0.0
-    gm_result_var.set(
-        f"Sem1: {gpa1} ({len(s1)})  |  Sem2: {gpa2} ({len(s2)})  |  CGPA: {cgpa}")
-    show_message('✓ Session CGPA calculated', 'success')
+    def done(semesters):
+        s1 = semesters.get('1')
+        s2 = semesters.get('2')
+        gpa1 = s1.gpa if s1 else 0.0
+        gpa2 = s2.gpa if s2 else 0.0
+        cgpa = combine_accumulators(semesters.values()).gpa
+        gm_result_var.set(
+            f"Sem1: {gpa1} ({s1.count if s1 else 0})  |  Sem2: {gpa2} ({s2.count if s2 else 0})  |  CGPA: {cgpa}")
+        show_message('✓ Session CGPA calculated', 'success')
+
+    jobs.submit(lambda: student_term_totals(name, level, session_val,
+                                            scale=grading_scale),
+                done, on_error=show_job_error, channel="grade_manager",
+                key=(name.lower(), level, session_val, None))
 
 
 gm_calc_sem_btn = tk.Button(gm_btn_frame, text="Calculate Semester GPA", command=gm_calculate_semester, font=(
@@ -1082,5 +1289,9 @@ gm_result_label.pack(fill=tk.X, padx=20, pady=(10, 20))
 # Show first tab and load records
 switch_tab("save")
 load_saved_records()
+window.bind("<F9>", toggle_profiling)
+startup_timing.mark("widgets built")
+window.after_idle(on_first_paint)
 
 window.mainloop()
+jobs.shutdown()
@@ -0,0 +1,234 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+
+# Off unless GRADE_METRICS is set or enable() is called. While off, timed
+# functions cost one flag check and count() returns straight away
+_enabled = False
+_profiling = False
+
+_lock = threading.Lock()
+_timers = {}    # name -> [calls, total seconds, max seconds, errors]
+_counters = {}  # name -> running total (rows scanned, bytes read, hits...)
+
+# cProfile only sees the thread it runs on, so each thread that calls a
+# timed function while profiling gets its own profiler; they are merged
+# when saved
+_profiles = []
+_local = threading.local()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def count(name, value=1):
+    """Add value to a counter (e.g. rows scanned, bytes read, cache hits)"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def _record(name, seconds, failed):
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = [0, 0.0, 0.0, 0]
+        timer[0] += 1
+        timer[1] += seconds
+        if seconds > timer[2]:
+            timer[2] = seconds
+        if failed:
+            timer[3] += 1
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _record(self.name, time.perf_counter() - self.start,
+                exc_type is not None)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Context manager timing a block under name (when enabled)"""
+    return _Span(name) if _enabled else _NO_SPAN
+
+
+def timed(name=None):
+    """Decorator timing every call (calls, total/max wall time, errors) under
+    name, by default module.function. Timed calls are also what the
+    cProfile capture records"""
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            failed = True
+            try:
+                if _profiling:
+                    result = _profiled_call(func, args, kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _record(label, time.perf_counter() - start, failed)
+        return wrapper
+    return decorate
+
+
+def _profiled_call(func, args, kwargs):
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        profile = _local.profile = cProfile.Profile()
+        with _lock:
+            _profiles.append(profile)
+
+    # Only the outermost timed call on a thread switches the profiler
+    depth = getattr(_local, "depth", 0)
+    if depth == 0:
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: one profiler per process, already running in
+            # another thread
+            return func(*args, **kwargs)
+    _local.depth = depth + 1
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.depth = depth
+        if depth == 0:
+            profile.disable()
+
+
+def start_profile():
+    """Start capturing cProfile data for timed calls (enables metrics)"""
+    global _profiling
+    enable()
+    with _lock:
+        _profiles.clear()
+    _profiling = True
+
+
+def stop_profile(path):
+    """Stop capturing and save the merged profile to path (open it with
+    pstats or snakeviz). Returns False if nothing was captured"""
+    global _profiling
+    _profiling = False
+    with _lock:
+        profiles = [profile for profile in _profiles
+                    if profile.getstats()]
+        _profiles.clear()
+    if not profiles:
+        return False
+
+    pstats.Stats(*profiles).dump_stats(path)
+    return True
+
+
+def is_profiling():
+    return _profiling
+
+
+def snapshot():
+    """Current timers and counters as a JSON-ready dict"""
+    with _lock:
+        return {
+            "timestamp": time.time(),
+            "timers": {name: {"calls": calls,
+                              "total_seconds": round(total, 6),
+                              "mean_seconds": round(total / calls, 6),
+                              "max_seconds": round(longest, 6),
+                              "errors": errors}
+                       for name, (calls, total, longest, errors)
+                       in sorted(_timers.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def prometheus_text():
+    """Timers and counters in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = []
+    for metric, key, kind in (
+            ("grade_calls_total", "calls", "counter"),
+            ("grade_call_errors_total", "errors", "counter"),
+            ("grade_call_seconds_total", "total_seconds", "counter"),
+            ("grade_call_seconds_max", "max_seconds", "gauge")):
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, timer in data["timers"].items():
+            lines.append(f'{metric}{{name="{name}"}} {timer[key]}')
+    lines.append("# TYPE grade_events_total counter")
+    for name, value in data["counters"].items():
+        lines.append(f'grade_events_total{{name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    """Write the metrics to path: Prometheus text for .prom/.txt files,
+    JSON otherwise"""
+    if path.endswith((".prom", ".txt")):
+        text = prometheus_text()
+    else:
+        text = json.dumps(snapshot(), indent=2)
+    with open(path, mode="w") as file:
+        file.write(text)
+
+
+# GRADE_METRICS=<file> records from startup and writes the file on exit;
+# GRADE_PROFILE=<file> also captures a cProfile of every timed call
+if os.environ.get("GRADE_METRICS"):
+    enable()
+    atexit.register(dump, os.environ["GRADE_METRICS"])
+if os.environ.get("GRADE_PROFILE"):
+    start_profile()
+    atexit.register(stop_profile, os.environ["GRADE_PROFILE"])
@@ -0,0 +1,145 @@
+import bisect
+import heapq
+
+# Index entries looked at per completion, and names compared per
+# suggestion, so lookups take about the same time however many names are
+# indexed
+MAX_CANDIDATES = 200
+MAX_SUGGEST_CANDIDATES = 60
+# Most typos (edits) a suggested name may be away from the typed text: one
+# per three letters typed, up to this many
+MAX_SUGGEST_DISTANCE = 2
+
+
+def normalize(text):
+    """Lower case with runs of whitespace collapsed, as names are matched"""
+    return " ".join(text.lower().split())
+
+
+def _suffixes(key):
+    # The key itself and the rest of it from each later word on
+    yield key
+    start = key.find(" ")
+    while start != -1:
+        yield key[start + 1:]
+        start = key.find(" ", start + 1)
+
+
+def edit_distance(text, other, limit):
+    """Damerau-Levenshtein distance (insertions, deletions, substitutions
+    and swaps of two neighbouring letters each count one) between text and
+    other, or limit + 1 as soon as it is known to be more than limit"""
+    if abs(len(text) - len(other)) > limit:
+        return limit + 1
+    before = None
+    row = list(range(len(other) + 1))
+    for i, char in enumerate(text, 1):
+        current = [i]
+        for j, other_char in enumerate(other, 1):
+            distance = min(row[j] + 1, current[j - 1] + 1,
+                           row[j - 1] + (char != other_char))
+            if (i > 1 and j > 1 and char == other[j - 2]
+                    and text[i - 2] == other_char):
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return limit + 1
+        before, row = row, current
+    return min(row[-1], limit + 1)
+
+
+class NameIndex:
+    """Names kept sorted for prefix completion (bisect over a sorted list)
+    and typo-tolerant suggestions. A name is found by the start of the
+    whole name or of any later word in it ("oka" finds "Ada Okafor"),
+    ignoring case. Names that differ only in case count once, under the
+    spelling seen first."""
+
+    def __init__(self, names=()):
+        self.names = []     # display names, by id
+        self._names = []    # normalized names, by id
+        self._ids = {}      # normalized name -> id
+        self._keys = []     # sorted normalized names and word suffixes
+        self._key_ids = []  # name id of each key
+        self.update(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def update(self, names):
+        """Add the names that are not indexed yet"""
+        added = []
+        for name in names:
+            key = normalize(name)
+            if not key or key in self._ids:
+                continue
+            name_id = self._ids[key] = len(self.names)
+            self.names.append(name)
+            self._names.append(key)
+            added.extend((suffix, name_id) for suffix in _suffixes(key))
+        if not added:
+            return
+
+        if len(added) > len(self._keys) // 16:
+            # Many at once (the first load): one sort beats many inserts
+            entries = list(zip(self._keys, self._key_ids))
+            entries.extend(added)
+            entries.sort()
+            self._keys = [key for key, _ in entries]
+            self._key_ids = [name_id for _, name_id in entries]
+            return
+
+        for key, name_id in added:
+            position = bisect.bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._key_ids.insert(position, name_id)
+
+    def complete(self, text, limit=10):
+        """Up to limit names starting with text, or with a word that does;
+        names that start with it come first"""
+        prefix = normalize(text)
+        if not prefix:
+            return []
+
+        keys = self._keys
+        start = bisect.bisect_left(keys, prefix)
+        found = {}
+        for position in range(start, min(start + MAX_CANDIDATES, len(keys))):
+            if not keys[position].startswith(prefix):
+                break
+            found[self._key_ids[position]] = None
+
+        matches = sorted((self._names[name_id], name_id)
+                         for name_id in found)
+        matches.sort(key=lambda match: not match[0].startswith(prefix))
+        return [self.names[name_id] for _, name_id in matches[:limit]]
+
+    def suggest(self, text, limit=5, max_distance=None):
+        """Up to limit names closest to a mistyped text, best first: those
+        whose whole name, or the rest of it from a later word on, is at most
+        max_distance edits from the text (default: one per three letters,
+        up to MAX_SUGGEST_DISTANCE). Names are drawn from around where the
+        text, and each of its words, would sort, so a typo in the first
+        letter of every word is not found"""
+        query = normalize(text)
+        if max_distance is None:
+            max_distance = min(len(query) // 3, MAX_SUGGEST_DISTANCE)
+        if not query or max_distance < 1:
+            return []
+
+        suffixes = list(_suffixes(query))
+        window = MAX_SUGGEST_CANDIDATES // (2 * len(suffixes)) or 1
+        candidates = set()
+        for suffix in suffixes:
+            position = bisect.bisect_left(self._keys, suffix)
+            candidates.update(self._key_ids[max(position - window, 0):
+                                            position + window])
+
+        found = []
+        for name_id in candidates:
+            distance = min(edit_distance(query, suffix, max_distance)
+                           for suffix in _suffixes(self._names[name_id]))
+            if distance <= max_distance:
+                found.append((distance, name_id))
+        return [self.names[name_id] for _, name_id in
+                heapq.nsmallest(limit, found)]
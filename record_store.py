@@ -0,0 +1,221 @@
+from array import array
+from itertools import islice
+
+import numpy as np
+
+from gpa_calculator import (DEFAULT_SCALE, GpaAccumulator, credit_units,
+                            group_totals)
+
+# Field order of the record tuples going in and out of the store
+FIELDS = ["student_name", "course", "score", "level", "semester", "session",
+          "credit_units"]
+
+# Attribute names of the string tables and typed-array columns of a store
+TABLES = ("names", "courses", "levels", "semesters", "sessions", "units")
+COLUMNS = ("student_ids", "course_ids", "level_ids", "semester_ids",
+           "session_ids", "unit_ids", "scores")
+
+
+def _score_array(scores):
+    """Scores as a byte array, clamped to 0-100 the way scale.point() reads
+    them, so a hand-edited 300 or -5 in the file loads instead of failing"""
+    try:
+        column = array("B", map(int, scores))
+    except OverflowError:
+        return array("B", [min(max(int(score), 0), 100) for score in scores])
+    if column and max(column) > 100:
+        column = array("B", [min(score, 100) for score in column])
+    return column
+
+
+class StringTable:
+    """Each distinct string stored once and referred to by a small integer id"""
+
+    __slots__ = ("values", "_ids")
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self._ids = dict(zip(self.values, range(len(self.values))))
+
+    def id(self, value):
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def ids(self, values):
+        """id() for a sequence of values; only values not seen before go
+        through Python code"""
+        ids = list(map(self._ids.get, values))
+        if None in ids:
+            for position, value_id in enumerate(ids):
+                if value_id is None:
+                    ids[position] = self.id(values[position])
+        return ids
+
+    def __len__(self):
+        return len(self.values)
+
+
+class RecordStore:
+    """Records held column by column: strings are interned in StringTables
+    and each row is a handful of integer ids in typed arrays, about 30 bytes
+    a record instead of a tuple or dict of strings.
+
+    Rows come back as tuples in FIELDS order (score as an int, clamped to
+    0-100) and are only built when asked for. Appends never move existing
+    rows, so a reader on another thread can keep using indexes below a len()
+    it has seen."""
+
+    def __init__(self, key=str.lower):
+        self.key = key
+        self.names = StringTable()
+        self.courses = StringTable()
+        self.levels = StringTable()
+        self.semesters = StringTable()
+        self.sessions = StringTable()
+        self.units = StringTable()  # kept as text: old rows have ""
+
+        self.student_ids = array("I")
+        self.course_ids = array("I")
+        self.level_ids = array("H")
+        self.semester_ids = array("H")
+        self.session_ids = array("H")
+        self.unit_ids = array("H")
+        self.scores = array("B")
+
+        # Row numbers per student key (see key), for student lookups. Built
+        # on the first lookup, then kept up to date by appends
+        self._rows_by_student = None
+
+    def append(self, record):
+        self.extend((record,))
+
+    def extend(self, records, chunk_size=10000):
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            self._extend_chunk(chunk)
+
+    def _extend_chunk(self, chunk):
+        names, courses, scores, levels, semesters, sessions, units = \
+            zip(*chunk)
+        # Converting scores first means a bad one leaves the store untouched
+        scores = _score_array(scores)
+
+        start = len(self.scores)
+        student_ids = self.names.ids(names)
+        self.student_ids.extend(student_ids)
+        self.course_ids.extend(self.courses.ids(courses))
+        self.level_ids.extend(self.levels.ids(levels))
+        self.semester_ids.extend(self.semesters.ids(semesters))
+        self.session_ids.extend(self.sessions.ids(sessions))
+        self.unit_ids.extend(self.units.ids(tuple(map(str, units))))
+        # Scores last: len() counts rows only once they are complete
+        self.scores.extend(scores)
+
+        rows_by_student = self._rows_by_student
+        if rows_by_student is not None:
+            for row, name in enumerate(names, start):
+                key = self.key(name)
+                rows = rows_by_student.get(key)
+                if rows is None:
+                    rows = rows_by_student[key] = array("I")
+                rows.append(row)
+
+    def _index_students(self):
+        # Group row numbers by student key with one stable sort
+        keys = StringTable()
+        key_ids = np.array(keys.ids([self.key(name)
+                                     for name in self.names.values]),
+                           dtype=np.intp)
+        row_keys = key_ids[np.frombuffer(self.student_ids, dtype="I")]
+        order = np.argsort(row_keys, kind="stable").astype("I")
+        ends = np.cumsum(np.bincount(row_keys, minlength=len(keys)))
+
+        rows_by_student = {}
+        start = 0
+        for key, end in zip(keys.values, ends.tolist()):
+            rows_by_student[key] = array("I", order[start:end].tobytes())
+            start = end
+        self._rows_by_student = rows_by_student
+
+    def __len__(self):
+        return len(self.scores)
+
+    def row(self, index):
+        return (self.names.values[self.student_ids[index]],
+                self.courses.values[self.course_ids[index]],
+                self.scores[index],
+                self.levels.values[self.level_ids[index]],
+                self.semesters.values[self.semester_ids[index]],
+                self.sessions.values[self.session_ids[index]],
+                self.units.values[self.unit_ids[index]])
+
+    def __iter__(self):
+        return map(self.row, range(len(self)))
+
+    def records(self, start=0, stop=None):
+        """Rows start:stop (slice rules) as dicts, for display or JSON"""
+        return [dict(zip(FIELDS, self.row(index)))
+                for index in range(len(self))[start:stop]]
+
+    def student_rows(self, student_name):
+        if self._rows_by_student is None:
+            self._index_students()
+        return [self.row(index) for index in
+                self._rows_by_student.get(self.key(student_name), ())]
+
+    def term_totals(self, scale=None):
+        """{student_name: {(level, session, semester): GpaAccumulator}} for
+        every record, summed per (student, term) group by
+        gpa_calculator.group_totals rather than row by row"""
+        scale = scale or DEFAULT_SCALE
+        if not len(self):
+            return {}
+
+        columns = [np.frombuffer(column, dtype=column.typecode)
+                   .astype(np.int64) for column in
+                   (self.student_ids, self.level_ids, self.session_ids,
+                    self.semester_ids)]
+        sizes = [len(self.names), len(self.levels), len(self.sessions),
+                 len(self.semesters)]
+        group = columns[0]
+        for column, size in zip(columns[1:], sizes[1:]):
+            group = group * size + column
+        groups, inverse = np.unique(group, return_inverse=True)
+
+        unit_values = np.array([credit_units(units)
+                                for units in self.units.values])
+        point_sums, unit_sums = group_totals(
+            np.frombuffer(self.scores, dtype="B"), inverse, len(groups),
+            scale, unit_values[np.frombuffer(self.unit_ids, dtype="H")])
+        point_sums = point_sums.tolist()
+        unit_sums = unit_sums.tolist()
+        counts = np.bincount(inverse, minlength=len(groups)).tolist()
+
+        # Unpack each group back into its string ids
+        ids = []
+        for size in reversed(sizes[1:]):
+            groups, remainder = np.divmod(groups, size)
+            ids.append(remainder.tolist())
+        semesters, sessions, levels = ids
+        students = groups.tolist()
+
+        totals = {}
+        for student, level, session, semester, point_sum, unit_sum, count in \
+                zip(students, levels, sessions, semesters, point_sums,
+                    unit_sums, counts):
+            name = self.names.values[student].strip()
+            if not name:
+                continue
+            term = (self.levels.values[level], self.sessions.values[session],
+                    self.semesters.values[semester])
+            terms = totals.setdefault(name, {})
+            accumulator = GpaAccumulator(point_sum, int(unit_sum), count)
+            terms[term] = terms[term] + accumulator if term in terms \
+                else accumulator
+        return totals
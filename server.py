@@ -0,0 +1,186 @@
+import os
+
+from flask import (Flask, Response, jsonify, request, send_from_directory,
+                   url_for)
+
+from chart_cache import ChartCache, records_digest
+
+from gpa_calculator import load_grading_scale
+from grade_manager import (
+    load_all_student_gpas,
+    load_record_store,
+    load_student_records,
+    query_student,
+    save_student_record,
+    save_student_records,
+    validate_score,
+    validate_units,
+)
+from visualization import render_score_chart
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+app = Flask(__name__, static_folder=None)
+
+# grade_manager keeps one index and one set of GPA totals per process, so
+# every request below is served from memory instead of re-reading the CSV
+grading_scale = load_grading_scale()
+chart_cache = ChartCache(
+    int(os.environ.get("CHART_CACHE_BYTES", 32 * 1024 * 1024)))
+
+CHART_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def _failure(message, status=400):
+    return jsonify({"success": False, "message": message}), status
+
+
+def _text(data, key):
+    return str(data.get(key) or "").strip()
+
+
+@app.get("/script.js")
+def frontend_script():
+    return send_from_directory(BASE_DIR, "script.js")
+
+
+@app.post("/api/save-record")
+def api_save_record():
+    data = request.get_json(silent=True) or {}
+    name = _text(data, "name")
+    course = _text(data, "course")
+    score = _text(data, "score")
+    units = _text(data, "credit_units") or "1"
+
+    if not name or not course or not score:
+        return _failure("All fields are required!")
+    if not validate_score(score):
+        return _failure("Score must be between 0-100!")
+    if not validate_units(units):
+        return _failure("Credit units must be a whole number above 0!")
+
+    save_student_record(name, course, int(score), level=_text(data, "level"),
+                        semester=_text(data, "semester"),
+                        session=_text(data, "session"),
+                        credit_units=int(units))
+    return jsonify({"success": True,
+                    "message": f"Record saved! {name} - {course}: {score}"})
+
+
+@app.post("/api/save-records")
+def api_save_records():
+    data = request.get_json(silent=True) or {}
+    records = data.get("records")
+    if not isinstance(records, list):
+        return _failure("Expected a list of records")
+
+    saved, rejected = save_student_records(
+        {"student_name": _text(record, "name"),
+         "course": _text(record, "course"),
+         "score": _text(record, "score"),
+         "level": _text(record, "level"),
+         "semester": _text(record, "semester"),
+         "session": _text(record, "session"),
+         "credit_units": _text(record, "credit_units")}
+        for record in records if isinstance(record, dict))
+    return jsonify({"success": True, "saved": saved, "rejected": rejected,
+                    "message": f"Saved {saved} records ({rejected} rejected)"})
+
+
+@app.post("/api/calculate-gpa")
+def api_calculate_gpa():
+    data = request.get_json(silent=True) or {}
+    name = _text(data, "name")
+    if not name:
+        return _failure("Please enter a student name!")
+
+    summary = query_student(name, level=_text(data, "level") or None,
+                            session=_text(data, "session") or None,
+                            scale=grading_scale)
+    if not summary["scores"]:
+        return _failure("No records found for this student!", 404)
+
+    return jsonify({"success": True, "gpa": summary["cgpa"],
+                    "score_count": len(summary["scores"]),
+                    "semester_gpas": summary["semester_gpas"]})
+
+
+@app.post("/api/get-chart")
+def api_get_chart():
+    data = request.get_json(silent=True) or {}
+    name = _text(data, "name")
+    if not name:
+        return _failure("Please enter a student name!")
+
+    summary = query_student(name, scale=grading_scale)
+    courses, scores = summary["courses"], summary["scores"]
+    if not scores:
+        return _failure("No records found for this student!", 404)
+
+    fmt = _text(data, "format") or "png"
+    if fmt not in CHART_TYPES:
+        return _failure("Chart format must be png or svg")
+
+    # The URL carries the records digest, so the browser refetches only when
+    # the student's data has changed
+    chart = url_for("api_chart", fmt=fmt, name=name,
+                    v=records_digest(name, courses, scores))
+    return jsonify({"success": True, "courses": courses, "scores": scores,
+                    "chart": chart})
+
+
+@app.get("/api/chart.<fmt>")
+def api_chart(fmt):
+    name = request.args.get("name", "").strip()
+    if fmt not in CHART_TYPES or not name:
+        return _failure("Unknown chart", 404)
+
+    summary = query_student(name, scale=grading_scale)
+    courses, scores = summary["courses"], summary["scores"]
+    if not scores:
+        return _failure("No records found for this student!", 404)
+
+    digest = records_digest(name, courses, scores)
+    image = chart_cache.get_or_render(
+        (name.lower(), fmt, digest),
+        lambda: render_score_chart(name, courses, scores, fmt=fmt))
+
+    response = Response(image, mimetype=CHART_TYPES[fmt])
+    if request.args.get("v") == digest:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+@app.get("/api/students")
+def api_students():
+    student_gpas = load_all_student_gpas(scale=grading_scale)
+    return jsonify({"success": True,
+                    "students": [{"name": name, "gpa": gpa}
+                                 for name, gpa in sorted(student_gpas.items())]})
+
+
+@app.get("/api/records")
+def api_records():
+    name = request.args.get("name", "").strip()
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", 100, type=int)
+
+    if offset < 0 or limit < 0:
+        return _failure("offset and limit must not be negative")
+
+    if name:
+        records = load_student_records(name)
+        total = len(records)
+        records = records[offset:offset + limit]
+    else:
+        # Only the requested page is turned into dicts
+        store = load_record_store()
+        total = len(store)
+        records = store.records(offset, offset + limit)
+
+    return jsonify({"success": True, "total": total, "records": records})
+
+
+if __name__ == "__main__":
+    app.run(host=os.environ.get("HOST", "127.0.0.1"),
+            port=int(os.environ.get("PORT", "5000")), threaded=True)
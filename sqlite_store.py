@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import sys
+
+from gpa_calculator import credit_units
+
+COLUMNS = ["student_name", "course", "score", "level", "semester", "session",
+           "credit_units"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    student_key TEXT NOT NULL,
+    student_name TEXT NOT NULL,
+    course TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level TEXT NOT NULL DEFAULT '',
+    semester TEXT NOT NULL DEFAULT '',
+    session TEXT NOT NULL DEFAULT '',
+    credit_units INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_records_student
+    ON records (student_key, level, session, semester);
+CREATE INDEX IF NOT EXISTS idx_records_course ON records (course);
+CREATE INDEX IF NOT EXISTS idx_records_term
+    ON records (level, semester, session);
+"""
+
+
+class SqliteBackend:
+    """Stores records in an SQLite database with indexed student and term
+    lookups. Records go in and come out as tuples in COLUMNS order"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        folder = os.path.dirname(db_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        # grade_manager serializes access, so the connection can be shared
+        # between the GUI worker and web server threads
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+        # Databases created before credit units were recorded
+        columns = [row[1] for row in
+                   self.conn.execute("PRAGMA table_info(records)")]
+        if "credit_units" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE records ADD COLUMN "
+                                  "credit_units INTEGER NOT NULL DEFAULT 1")
+
+    def _values(self, row):
+        name, course, score, level, semester, session, units = row
+        return (name.lower(), name, course, int(score), level, semester,
+                session, credit_units(units))
+
+    def save_records(self, rows):
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO records (student_key, student_name, course, score,"
+                " level, semester, session, credit_units)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._values(row) for row in rows))
+        return cursor.rowcount
+
+    def save_record(self, row):
+        self.save_records([row])
+
+    def student_rows(self, student_name, level=None, semester=None,
+                     session=None):
+        return self.query_rows(student_name, level=level, semester=semester,
+                               session=session).fetchall()
+
+    def query_rows(self, student_name=None, course=None, level=None,
+                   semester=None, session=None, min_score=None,
+                   max_score=None):
+        """Cursor over the matching records in the order they were saved;
+        rows are only fetched as it is read"""
+        conditions = []
+        params = []
+
+        if student_name is not None:
+            conditions.append("student_key = ?")
+            params.append(student_name.lower())
+        for column, value in (("course", course), ("level", level),
+                              ("semester", semester), ("session", session)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if min_score is not None:
+            conditions.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            conditions.append("score <= ?")
+            params.append(max_score)
+
+        sql = "SELECT " + ", ".join(COLUMNS) + " FROM records"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self.conn.execute(sql + " ORDER BY id", params)
+
+    def all_rows(self):
+        return self.conn.execute(
+            "SELECT " + ", ".join(COLUMNS) +
+            " FROM records ORDER BY id").fetchall()
+
+    def data_version(self):
+        # Changes only when another connection commits to the database
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def migrate_csv_to_sqlite(csv_path, db_path):
+    """Copy every row of a CSV record file into an empty SQLite database.
+    Returns the number of rows copied, or 0 if the database already has data"""
+    backend = SqliteBackend(db_path)
+
+    try:
+        if backend.count() > 0 or not os.path.isfile(csv_path):
+            return 0
+
+        from grade_manager import parse_records
+
+        with open(csv_path, mode="r", newline="") as file:
+            return backend.save_records(parse_records(file))
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    from grade_manager import DB_PATH, FILE_PATH
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else FILE_PATH
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+
+    copied = migrate_csv_to_sqlite(csv_path, db_path)
+    if copied:
+        print(f"Migrated {copied} records from {csv_path} to {db_path}")
+    else:
+        print(f"Nothing migrated: {db_path} already has records "
+              f"or {csv_path} does not exist")
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Imported first by main.py, so marks are measured from (almost) launch
+_START = time.perf_counter()
+
+durations = {}  # label -> seconds spent, e.g. per imported module
+marks = {}      # label -> seconds since launch, e.g. "first paint"
+
+
+@contextmanager
+def timed(label):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        durations[label] = time.perf_counter() - start
+
+
+def mark(label):
+    marks[label] = time.perf_counter() - _START
+
+
+def report():
+    """Write the startup timings where GRADE_STARTUP_REPORT points: '-' for
+    stderr, otherwise a file that gets one JSON line per launch so runs can
+    be compared. Does nothing when the variable is unset"""
+    target = os.environ.get("GRADE_STARTUP_REPORT")
+    data = {
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "durations": {label: round(value, 4)
+                      for label, value in durations.items()},
+        "marks": {label: round(value, 4) for label, value in marks.items()},
+    }
+
+    if not target:
+        return data
+
+    if target == "-":
+        for label, value in data["durations"].items():
+            print(f"{label:<32} {value * 1000:8.1f} ms", file=sys.stderr)
+        for label, value in data["marks"].items():
+            print(f"{label:<32} {value * 1000:8.1f} ms after launch",
+                  file=sys.stderr)
+    else:
+        with open(target, mode="a") as file:
+            file.write(json.dumps(data) + "\n")
+
+    return data
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from locked_writer import JOURNAL_END, CsvAppender
+
+HEADER = ["student_name", "course", "score"]
+FIRST = [("Ann", "CSC101", "70"), ("Bob", "CSC101", "55")]
+SECOND = [("Cy", "MTH101", "48"), ("Dee", "MTH101", "91")]
+
+
+class Crash(Exception):
+    pass
+
+
+def torn_apply(fraction):
+    """Stand-in for CsvAppender._apply that writes only part of the batch
+    and then dies, like a writer killed mid-append"""
+    def apply(self, offset, payload):
+        with open(self.path, mode="a", newline="") as file:
+            file.write(payload[:int(len(payload) * fraction)])
+        raise Crash()
+    return apply
+
+
+class JournalTest(unittest.TestCase):
+    """A batch interrupted mid-append must be cut back and replayed, once,
+    by whoever takes the lock next"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "students.csv")
+        self.appender = CsvAppender(self.path)
+        with self.appender.locked():
+            self.appender.append(FIRST, header=HEADER)
+        self.expected = ("student_name,course,score\r\n"
+                         "Ann,CSC101,70\r\nBob,CSC101,55\r\n"
+                         "Cy,MTH101,48\r\nDee,MTH101,91\r\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def read(self):
+        with open(self.path, mode="r", newline="") as file:
+            return file.read()
+
+    def journal(self):
+        with open(self.appender.journal_path, mode="r", newline="") as file:
+            return file.read()
+
+    def crash_during_append(self, fraction=0.5):
+        with mock.patch.object(CsvAppender, "_apply", torn_apply(fraction)):
+            with self.assertRaises(Crash):
+                with self.appender.locked():
+                    self.appender.append(SECOND)
+
+    def test_append_clears_the_journal(self):
+        with self.appender.locked():
+            self.appender.append(SECOND)
+        self.assertEqual(self.read(), self.expected)
+        self.assertEqual(self.journal(), "")
+
+    def test_torn_append_is_replayed_by_the_next_writer(self):
+        self.crash_during_append()
+        self.assertNotEqual(self.read(), self.expected)
+        self.assertTrue(self.journal().endswith(JOURNAL_END))
+
+        # Another process's appender, as after a restart
+        with CsvAppender(self.path).locked():
+            pass
+        self.assertEqual(self.read(), self.expected)
+        self.assertEqual(self.journal(), "")
+
+    def test_torn_append_is_replayed_before_reading(self):
+        self.crash_during_append(fraction=0.9)
+
+        with CsvAppender(self.path).committed() as file:
+            self.assertEqual(file.read(), self.expected)
+
+    def test_replay_then_append(self):
+        self.crash_during_append()
+
+        with self.appender.locked():
+            self.appender.append([("Eve", "PHY101", "62")])
+        self.assertEqual(self.read(), self.expected + "Eve,PHY101,62\r\n")
+
+    def test_replay_happens_once(self):
+        self.crash_during_append()
+
+        self.assertTrue(self.appender.recover())
+        self.assertFalse(self.appender.recover())
+        self.assertEqual(self.read(), self.expected)
+
+    def test_replay_after_the_batch_was_fully_written(self):
+        # Died after writing the rows but before clearing the journal
+        self.crash_during_append(fraction=1.0)
+
+        self.assertTrue(self.appender.recover())
+        self.assertEqual(self.read(), self.expected)
+
+    def test_incomplete_journal_entry_is_dropped(self):
+        # Died while writing the journal: the CSV was never touched
+        before = self.read()
+        size = os.path.getsize(self.path)
+        with open(self.appender.journal_path, mode="w", newline="") as file:
+            file.write(f"{size}\nCy,MTH101,48\r\nDee,MT")
+
+        with self.appender.locked():
+            pass
+        self.assertEqual(self.read(), before)
+        self.assertEqual(self.journal(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import snapshot
+from record_store import RecordStore
+from snapshot import MAGIC, load_snapshot, save_snapshot
+
+FIELDNAMES = ["student_name", "course", "score", "level", "semester", "session",
+              "credit_units"]
+
+
+def make_rows(count, start=0):
+    return [(f"Student {i % 500}", f"CSC{i % 40:03d}", str(i % 101),
+             ("100", "200", "300")[i % 3], str(i % 2 + 1), "2023/2024",
+             str(i % 4 + 1))
+            for i in range(start, start + count)]
+
+
+def expected(rows):
+    # Rows as RecordStore gives them back: the score as an int
+    return [(name, course, int(score), level, semester, session, units)
+            for name, course, score, level, semester, session, units in rows]
+
+
+class SnapshotTest(unittest.TestCase):
+    """Snapshots must be used only while every row they hold is still in the
+    CSV, unchanged"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.folder, "students.csv")
+        self.path = self.csv_path + ".snapshot"
+        # Big enough that a mid-file edit is far from both ends
+        self.rows = make_rows(10000)
+        self.write_csv(self.rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_csv(self, rows, mode="w"):
+        with open(self.csv_path, mode=mode, newline="") as file:
+            writer = csv.writer(file)
+            if mode == "w":
+                writer.writerow(FIELDNAMES)
+            writer.writerows(rows)
+
+    def take_snapshot(self):
+        store = RecordStore()
+        store.extend(self.rows)
+        stat = os.stat(self.csv_path)
+        save_snapshot(store, self.path, self.csv_path, stat.st_size,
+                      stat.st_mtime_ns)
+        return stat
+
+    def edit_in_place(self, old, new):
+        # Same-size rewrite of the first match, keeping the mtime, so only
+        # the fingerprint can tell
+        self.assertEqual(len(old), len(new))
+        stat = os.stat(self.csv_path)
+        with open(self.csv_path, mode="rb") as file:
+            data = file.read()
+        self.assertIn(old, data)
+        with open(self.csv_path, mode="wb") as file:
+            file.write(data.replace(old, new, 1))
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def rewrite_header(self, change):
+        with open(self.path, mode="rb") as file:
+            data = file.read()
+        header_end = len(MAGIC) + 8
+        header_size, = struct.unpack("<Q", data[len(MAGIC):header_end])
+        header = json.loads(data[header_end:header_end + header_size])
+        change(header)
+        encoded = json.dumps(header).encode("utf-8")
+        with open(self.path, mode="wb") as file:
+            file.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded +
+                       data[header_end + header_size:])
+
+    def test_round_trip(self):
+        stat = self.take_snapshot()
+        store, covered = load_snapshot(self.path, self.csv_path)
+        self.assertEqual(covered, stat.st_size)
+        self.assertEqual(list(store), expected(self.rows))
+
+    def test_rows_appended_after_the_snapshot_are_left_to_parse(self):
+        stat = self.take_snapshot()
+        self.write_csv(make_rows(50, start=10000), mode="a")
+
+        store, covered = load_snapshot(self.path, self.csv_path)
+        self.assertEqual(covered, stat.st_size)
+        self.assertEqual(list(store), expected(self.rows))
+
+    def test_same_size_rewrite_with_new_mtime(self):
+        stat = self.take_snapshot()
+        with open(self.csv_path, mode="rb") as file:
+            data = file.read()
+        with open(self.csv_path, mode="wb") as file:
+            file.write(data)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_same_size_edit_in_the_middle(self):
+        self.take_snapshot()
+        middle = self.rows[5000]
+        row = ",".join(middle).encode("ascii")
+        edited = ",".join(middle[:2] + ("X" * len(middle[2]),)
+                          + middle[3:]).encode("ascii")
+        self.edit_in_place(row, edited)
+
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_edit_in_the_middle_then_append(self):
+        self.take_snapshot()
+        middle = ",".join(self.rows[5000]).encode("ascii")
+        self.edit_in_place(middle, middle.replace(b"Student", b"Stvdent"))
+        self.write_csv(make_rows(10, start=10000), mode="a")
+
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_truncated_csv(self):
+        stat = self.take_snapshot()
+        os.truncate(self.csv_path, stat.st_size - 10)
+
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_other_byte_order(self):
+        other = "big" if sys.byteorder == "little" else "little"
+        with mock.patch.object(snapshot, "sys", mock.Mock(byteorder=other)):
+            self.take_snapshot()
+
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_other_item_size(self):
+        self.take_snapshot()
+
+        def widen(header):
+            header["columns"][0][2] *= 2
+
+        self.rewrite_header(widen)
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_row_count_mismatch(self):
+        self.take_snapshot()
+
+        def add_row(header):
+            header["rows"] += 1
+
+        self.rewrite_header(add_row)
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+    def test_missing_or_damaged_snapshot(self):
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+        self.take_snapshot()
+        with open(self.path, mode="r+b") as file:
+            file.seek(len(MAGIC) + 8)
+            file.write(b"not json")
+        self.assertEqual(load_snapshot(self.path, self.csv_path), (None, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
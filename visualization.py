@@ -1,45 +1,187 @@
-import matplotlib.pyplot as plt
-
-
-def show_score_chart(student_name, courses, scores):
-    plt.figure(figsize=(6, 4))
-    plt.bar(courses, scores)
-    plt.title(f"{student_name}'s Course Scores")
-    plt.xlabel("Courses")
-    plt.ylabel("Scores")
-    plt.ylim(0, 100)
-    plt.xticks(rotation=30)
-    plt.tight_layout()
-    plt.show()
-
-
-def show_all_gpas_chart(student_gpas):
-    """Display all students' GPAs as a bar chart
-    
-    Args:
-        student_gpas: dict {student_name: gpa}
+import io
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import metrics
+from gpa_calculator import DEFAULT_SCALE
+
+
+@metrics.timed()
+def render_score_chart(student_name, courses, scores, fmt="png"):
+    """Render the course scores chart off-screen (Agg, no window or pyplot
+    state) and return the image bytes in the given format (png or svg)"""
+    fig = Figure(figsize=(6, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(courses, scores)
+    ax.set_title(f"{student_name}'s Course Scores")
+    ax.set_xlabel("Courses")
+    ax.set_ylabel("Scores")
+    ax.set_ylim(0, 100)
+    ax.tick_params(axis="x", labelrotation=30)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+# "auto" draws one bar per student up to this many, then a histogram
+MAX_GPA_BARS = 40
+# No per-bar value labels above this many bars
+VALUE_LABEL_LIMIT = 30
+TOP_N = 20
+GPA_MODES = ("auto", "all", "histogram", "bands", "top", "bottom")
+
+
+def gpa_histogram(gpas, max_gpa, bins=10):
+    """Count GPAs from 0 to max_gpa into equal-width bins; returns (bin
+    labels, counts)"""
+    counts, edges = np.histogram(np.asarray(gpas, dtype=float), bins=bins,
+                                 range=(0.0, max_gpa))
+    labels = [f"{low:.1f}-{high:.1f}" for low, high in zip(edges, edges[1:])]
+    return labels, counts.tolist()
+
+
+def class_band_counts(gpas, bands):
+    """Count GPAs per degree class, bands being (lowest GPA, name) in
+    ascending order as GradingScale.classes; returns (class names,
+    counts)"""
+    lower_bounds = np.array([lower for lower, _ in bands[1:]])
+    band_index = np.searchsorted(lower_bounds,
+                                 np.asarray(gpas, dtype=float), side="right")
+    counts = np.bincount(band_index, minlength=len(bands))
+    return [name for _, name in bands], counts.tolist()
+
+
+def top_gpas(student_gpas, n=TOP_N, bottom=False):
+    """The n highest (or lowest) GPAs, best first (worst first for bottom);
+    returns (names, gpas)"""
+    names = list(student_gpas)
+    gpas = np.fromiter(student_gpas.values(), dtype=float, count=len(names))
+    n = min(n, len(names))
+    if n == 0:
+        return [], []
+
+    keys = gpas if bottom else -gpas
+    if n < len(names):
+        picked = np.argpartition(keys, n - 1)[:n]
+    else:
+        picked = np.arange(len(names))
+    picked = picked[np.argsort(keys[picked], kind="stable")]
+    return [names[i] for i in picked], gpas[picked].tolist()
+
+
+@metrics.timed()
+def gpa_chart_data(student_gpas, mode="auto", n=TOP_N, scale=None):
+    """Bars for the all-GPAs chart in the given mode (see GPA_MODES)
+
+    Returns a dict of labels, values, title, xlabel, ylabel, ylim and
+    value_format. Every mode except "all" draws a bounded number of bars,
+    so the chart costs the same for ten students or ten thousand. The GPA
+    axis and the classes of degree come from the grading scale.
     """
-    if not student_gpas:
-        print("No GPA data to display")
-        return
-    
-    students = list(student_gpas.keys())
-    gpas = list(student_gpas.values())
-    
-    plt.figure(figsize=(10, 5))
-    bars = plt.bar(students, gpas, color='#667eea')
-    plt.title("All Students' GPAs", fontsize=14, fontweight='bold')
-    plt.xlabel("Student Name")
-    plt.ylabel("GPA")
-    plt.ylim(0, 5)
-    
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
-                f'{height:.2f}',
-                ha='center', va='bottom', fontweight='bold')
-    
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.show()
+    scale = scale or DEFAULT_SCALE
+    if mode not in GPA_MODES:
+        raise ValueError(f"Unknown GPA chart mode: {mode}")
+    if mode == "auto":
+        mode = "all" if len(student_gpas) <= MAX_GPA_BARS else "histogram"
+
+    if mode in ("all", "top", "bottom"):
+        if mode == "all":
+            labels, values = list(student_gpas), list(student_gpas.values())
+            title = "All Students' GPAs"
+        else:
+            labels, values = top_gpas(student_gpas, n, bottom=mode == "bottom")
+            title = f"{'Bottom' if mode == 'bottom' else 'Top'} {len(values)} GPAs"
+        return {"labels": labels, "values": values, "title": title,
+                "xlabel": "Student Name", "ylabel": "GPA",
+                "ylim": (0, scale.max_point),
+                "value_format": '{:.2f}'}
+
+    gpas = np.fromiter(student_gpas.values(), dtype=float,
+                       count=len(student_gpas))
+    if mode == "histogram":
+        labels, values = gpa_histogram(gpas, scale.max_point)
+        title, xlabel = "GPA Distribution", "GPA"
+    else:
+        labels, values = class_band_counts(gpas, scale.classes)
+        title, xlabel = "Students per Class of Degree", "Class"
+    return {"labels": labels, "values": values,
+            "title": f"{title} ({len(gpas)} students)", "xlabel": xlabel,
+            "ylabel": "Students", "ylim": (0, max(max(values), 1) * 1.15),
+            "value_format": '{:d}'}
+
+
+class ChartPanel:
+    """A single matplotlib figure embedded in a Tk frame and reused for every
+    chart. Bars and value labels are updated in place (set_height, set_x,
+    set_text) rather than drawing a new figure each time"""
+
+    def __init__(self, parent, figsize=(8, 4)):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        # Fixed margins (room for rotated labels) instead of a tight_layout
+        # pass on every update
+        self.figure.subplots_adjust(left=0.08, right=0.98, top=0.9,
+                                    bottom=0.28)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+        self.bars = []
+        self.value_labels = []
+
+    @metrics.timed()
+    def show_bars(self, labels, values, title, xlabel, ylabel, ylim,
+                  color="#667eea", value_format=None, rotation=30):
+        ax = self.ax
+        count = len(values)
+
+        # Reuse existing bars; only add or remove the difference
+        for bar, x, value in zip(self.bars, range(count), values):
+            bar.set_x(x - 0.4)
+            bar.set_height(value)
+            bar.set_color(color)
+        if count > len(self.bars):
+            extra = range(len(self.bars), count)
+            self.bars.extend(ax.bar(extra, values[len(self.bars):],
+                                    width=0.8, color=color))
+        for bar in self.bars[count:]:
+            bar.remove()
+        del self.bars[count:]
+
+        texts = [value_format.format(value) for value in values] \
+            if value_format and count <= VALUE_LABEL_LIMIT else []
+        for text, x, value, label in zip(self.value_labels, range(count),
+                                         values, texts):
+            text.set_position((x, value))
+            text.set_text(label)
+        for x in range(len(self.value_labels), len(texts)):
+            self.value_labels.append(ax.text(x, values[x], texts[x],
+                                             ha='center', va='bottom',
+                                             fontweight='bold'))
+        for text in self.value_labels[len(texts):]:
+            text.remove()
+        del self.value_labels[len(texts):]
+
+        ax.set_xticks(range(count), labels, rotation=rotation,
+                      ha='right' if rotation else 'center')
+        ax.set_xlim(-0.6, max(count, 1) - 0.4)
+        ax.set_ylim(*ylim)
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        self.canvas.draw_idle()
+
+    def show_scores(self, student_name, courses, scores):
+        self.show_bars(courses, scores, f"{student_name}'s Course Scores",
+                       "Courses", "Scores", (0, 100))
+
+    def show_gpas(self, student_gpas, mode="auto", scale=None):
+        chart = gpa_chart_data(student_gpas, mode, scale=scale)
+        self.show_bars(chart["labels"], chart["values"], chart["title"],
+                       chart["xlabel"], chart["ylabel"], chart["ylim"],
+                       value_format=chart["value_format"], rotation=45)